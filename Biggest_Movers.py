@@ -0,0 +1,250 @@
+import pandas as pd
+import altair as alt
+import streamlit as st
+from mas_data.schema import DEMO_COL_MAP
+from mas_data.shared import get_snapshot
+from mas_data.stats import SUPPRESSION
+
+st.set_page_config(page_icon="Assets/metro-atl-speaks.svg")
+
+# Question catalog and the year-over-year movers are shared by every session; one snapshot
+# per rerun keeps them consistent when the data is reloaded in the background
+snapshot = get_snapshot()
+catalog = snapshot.catalog
+movers = snapshot.movers
+
+custom_css = """
+<style>
+.stMainBlockContainer {
+            max-width:68rem;
+        }
+.stSelectbox div[data-baseweb="select"] > div:first-child {
+    border: 2px solid #808080; /* Example: 2px solid green border */
+    border-radius: 5px; /* Optional: rounded corners */
+}
+/* This selector might need adjustment based on your Streamlit version and specific setup */
+.stHeaderLogo img {
+    width: auto; /* Adjust as needed */
+    height: 100px; /* Maintain aspect ratio */
+}
+.stAppHeader { /* This class targets the top navigation container */
+    background-color: #f9f9f9;
+    min-height: 50px; /* Adjust height as needed */
+    padding-top: 20px; /* Add padding for vertical spacing */
+    padding-bottom: 20px;
+}
+
+/* Navigation menu items - comprehensive targeting */
+.rc-overflow-item,
+[data-testid="stHeader"] .rc-overflow-item,
+.stAppHeader .rc-overflow-item,
+header .rc-overflow-item,
+.stApp > header .rc-overflow-item,
+.stAppHeader *,
+[data-testid="stHeader"] *,
+header *,
+.stApp > header * {
+    font-size: 18px !important;
+    font-weight: 600 !important;
+    
+}
+
+.rc-overflow-item { /* This class targets the individual navigation items */
+    font-size: 20px; /* Adjust font size as needed */
+    padding: 15px; /* Adjust padding for button size */
+}
+
+/* Floating scroll down icon */
+.scroll-indicator {
+    position: fixed;
+    bottom: 30px;
+    right: 30px;
+    width: 50px;
+    height: 50px;
+    background-color: #2364a0;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    cursor: pointer;
+    z-index: 1000;
+    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15);
+    transition: all 0.3s ease;
+    opacity: 0.8;
+}
+
+.scroll-indicator::before {
+    content: "↓";
+    color: white;
+    font-size: 24px;
+    font-weight: bold;
+}
+
+/* Remove bouncing animation - keeping it static */
+</style>
+"""
+
+# Inject the custom CSS
+st.markdown(custom_css, unsafe_allow_html=True)
+st.logo("Assets/arc-logo-black-trans.png",size="large")
+
+# Initialize session state for mobile view if not exists
+if 'is_mobile' not in st.session_state:
+    st.session_state.is_mobile = False
+
+# Sidebar - Mobile view toggle
+st.sidebar.markdown("### 📱 Display Options")
+st.session_state.is_mobile = st.sidebar.checkbox("Use Mobile View (Vertical Charts)", 
+                                                   value=st.session_state.is_mobile,
+                                                   help="Toggle this to switch between horizontal (desktop) and vertical (mobile) chart layouts")
+
+if st.session_state.is_mobile:
+    st.sidebar.info("📊 Charts displayed vertically")
+else:
+    st.sidebar.info("🖥️ Charts displayed horizontally")
+
+# Create title with logo
+col_logo, col_title = st.columns([1, 4])
+with col_logo:
+    st.image("Assets/metro-atl-speaks.svg", width=350)
+with col_title:
+    st.markdown("""
+    <div style='color: #2364a0; font-size: 40px; font-weight:Semibold ; margin-top: 13px;'>
+        <p>Biggest Movers Dashboard</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown("""
+    <div style='line-height: 1.5;'>
+        <p>
+            <span style='color: #59595b; font-size: 15px; font-weight:600 ;'>
+            *Mobile view is available via a checkbox in the sidebar.
+            </span>
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown("""
+    <div style='line-height: 1.5;'>
+        <p>
+            <span style='color: #59595b; font-size: 15px; font-weight:400 ;'>
+            Where did opinion shift the most? Every question, demographic group and response is compared with the
+            previous survey year the question was asked, and ranked by the change in percentage points.
+            Select a row to open it in the Metro Summary or Demographic Breakdown view.
+            </span>
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+# Short question text by question code
+question_text = catalog.drop_duplicates("question").set_index("question")["q_short"]
+
+col1, col2, col3 = st.columns([1, 2, 1], gap="small")
+with col1:
+    year_options = ["All years"] + [str(year) for year in sorted(movers["survey year"].unique(), reverse=True)]
+    selected_year = st.selectbox(
+        "Change into survey year",
+        year_options,
+        index=1 if len(year_options) > 1 else 0,
+        key="movers_year_selectbox",
+        help="Compare this survey year with the previous year each question was asked")
+with col2:
+    selected_demographics = st.multiselect(
+        "Demographics",
+        ["Metro"] + list(DEMO_COL_MAP),
+        placeholder="All demographics",
+        key="movers_demographics",
+        help="Metro is the whole region; leave empty to rank every demographic group")
+with col3:
+    min_n = st.number_input(
+        "Minimum respondents",
+        min_value=1,
+        value=SUPPRESSION.min_n,
+        step=10,
+        key="movers_min_n",
+        help="Leave out groups with fewer answers than this in either year")
+top_n = st.slider("Number of movers to show", min_value=10, max_value=100, value=25, step=5, key="movers_top_n")
+
+# Movers are already ranked by size, so filtering keeps the order
+shown = movers[
+    ~movers["suppressed"]
+    & (movers["group n"] >= min_n)
+    & (movers["previous group n"] >= min_n)
+    & (movers["response"] != "DK")
+    & (movers["group"] != "DK")
+]
+if selected_year != "All years":
+    shown = shown[shown["survey year"] == int(selected_year)]
+if selected_demographics:
+    shown = shown[shown["demographic"].isin(selected_demographics)]
+shown = shown.head(top_n).reset_index(drop=True)
+
+if len(shown) > 0:
+    shown["label"] = (
+        shown["question"].map(question_text).str.split("|").str[0] + " · "
+        + shown["group"].where(shown["demographic"] != "Metro", "Metro Atlanta") + " · "
+        + shown["response"] + " (" + shown["previous year"].astype(str) + "→" + shown["survey year"].astype(str) + ")"
+    )
+    movers_chart = (
+        alt.Chart(shown)
+        .mark_bar()
+        .encode(
+            x=alt.X("change:Q", title="Change (percentage points)", axis=alt.Axis(format="+.0%")),
+            y=alt.Y("label:N", title=None, sort=None, axis=alt.Axis(labelLimit=0)),
+            color=alt.condition("datum.change > 0", alt.value("#2364a0"), alt.value("#F15B29")),
+            tooltip=[
+                alt.Tooltip("label", title="Mover"),
+                alt.Tooltip("previous percent", format=".0%", title="Before"),
+                alt.Tooltip("percent", format=".0%", title="After"),
+                alt.Tooltip("change", format="+.1%", title="Change"),
+                alt.Tooltip("group n", title="Respondents"),
+            ],
+        )
+        .properties(height=alt.Step(20))
+    )
+    st.altair_chart(movers_chart, use_container_width=True)
+
+    table = pd.DataFrame({
+        "Question": shown["question"].map(question_text),
+        "Demographic": shown["demographic"],
+        "Group": shown["group"],
+        "Response": shown["response"],
+        "Years": shown["previous year"].astype(str) + " → " + shown["survey year"].astype(str),
+        "Before": shown["previous percent"] * 100,
+        "After": shown["percent"] * 100,
+        "Change": shown["change"] * 100,
+        "Respondents": shown["group n"],
+    })
+    movers_event = st.dataframe(
+        table,
+        column_config={
+            "Before": st.column_config.NumberColumn(format="%.0f%%"),
+            "After": st.column_config.NumberColumn(format="%.0f%%"),
+            "Change": st.column_config.NumberColumn("Change (pts)", format="%+.1f"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="movers_table")
+
+    if movers_event.selection.rows:
+        mover = shown.iloc[movers_event.selection.rows[0]]
+        if mover["demographic"] == "Metro":
+            target_page, target_name = "Metro_Summary.py", "Metro Summary"
+        else:
+            target_page, target_name = "Demographic_Breakdown.py", f"Demographic Breakdown by {mover['demographic']}"
+        if st.button(f"Open {question_text[mover['question']].split('|')[0]} ({mover['survey year']}) in {target_name}", type="primary"):
+            # The other pages pick their question, year and demographic up from the shared state
+            st.session_state.shared_question_text = question_text[mover["question"]]
+            st.session_state.shared_year_text = str(mover["survey year"])
+            if mover["demographic"] != "Metro":
+                st.session_state.saved_demographic = mover["demographic"]
+            for key in ["metro_question_selectbox", "metro_year_radio", "demo_question_selectbox", "demo_year_radio", "demo_segmented_control"]:
+                st.session_state.pop(key, None)
+            st.switch_page(target_page)
+    else:
+        st.caption("Select a row in the table to open it in the Metro Summary or Demographic Breakdown view.")
+    st.caption(f"Note: Don't Know answers, groups with fewer than {min_n} respondents in either year and groups too small to report (an effective sample size below {SUPPRESSION.min_n_eff:g}) are left out. Responses offered in only one of the two years cannot be compared.")
+else:
+    st.warning("No movers match the selected filters.")
@@ -0,0 +1,234 @@
+import altair as alt
+import streamlit as st
+import textwrap
+from mas_data.schema import DEMO_COL_MAP
+from mas_data.shared import get_snapshot
+from mas_data.stats import SUPPRESSION
+
+st.set_page_config(page_icon="Assets/metro-atl-speaks.svg")
+
+# Question catalog, aggregate cube and respondent matrix are shared by every session;
+# one snapshot per rerun keeps them consistent when the data is reloaded in the background
+snapshot = get_snapshot()
+catalog = snapshot.catalog
+cube = snapshot.cube
+respondents = snapshot.respondents
+
+custom_css = """
+<style>
+.stMainBlockContainer {
+            max-width:68rem;
+        }
+.stSelectbox div[data-baseweb="select"] > div:first-child {
+    border: 2px solid #808080; /* Example: 2px solid green border */
+    border-radius: 5px; /* Optional: rounded corners */
+}
+/* This selector might need adjustment based on your Streamlit version and specific setup */
+.stHeaderLogo img {
+    width: auto; /* Adjust as needed */
+    height: 100px; /* Maintain aspect ratio */
+}
+.stAppHeader { /* This class targets the top navigation container */
+    background-color: #f9f9f9;
+    min-height: 50px; /* Adjust height as needed */
+    padding-top: 20px; /* Add padding for vertical spacing */
+    padding-bottom: 20px;
+}
+
+/* Navigation menu items - comprehensive targeting */
+.rc-overflow-item,
+[data-testid="stHeader"] .rc-overflow-item,
+.stAppHeader .rc-overflow-item,
+header .rc-overflow-item,
+.stApp > header .rc-overflow-item,
+.stAppHeader *,
+[data-testid="stHeader"] *,
+header *,
+.stApp > header * {
+    font-size: 18px !important;
+    font-weight: 600 !important;
+    
+}
+
+.rc-overflow-item { /* This class targets the individual navigation items */
+    font-size: 20px; /* Adjust font size as needed */
+    padding: 15px; /* Adjust padding for button size */
+}
+
+/* Floating scroll down icon */
+.scroll-indicator {
+    position: fixed;
+    bottom: 30px;
+    right: 30px;
+    width: 50px;
+    height: 50px;
+    background-color: #2364a0;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    cursor: pointer;
+    z-index: 1000;
+    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15);
+    transition: all 0.3s ease;
+    opacity: 0.8;
+}
+
+.scroll-indicator::before {
+    content: "↓";
+    color: white;
+    font-size: 24px;
+    font-weight: bold;
+}
+
+/* Remove bouncing animation - keeping it static */
+</style>
+"""
+
+# Inject the custom CSS
+st.markdown(custom_css, unsafe_allow_html=True)
+st.logo("Assets/arc-logo-black-trans.png",size="large")
+
+# Initialize session state for mobile view if not exists
+if 'is_mobile' not in st.session_state:
+    st.session_state.is_mobile = False
+
+# Sidebar - Mobile view toggle
+st.sidebar.markdown("### 📱 Display Options")
+st.session_state.is_mobile = st.sidebar.checkbox("Use Mobile View (Vertical Charts)", 
+                                                   value=st.session_state.is_mobile,
+                                                   help="Toggle this to switch between horizontal (desktop) and vertical (mobile) chart layouts")
+
+if st.session_state.is_mobile:
+    st.sidebar.info("📊 Charts displayed vertically")
+else:
+    st.sidebar.info("🖥️ Charts displayed horizontally")
+
+# Create title with logo
+col_logo, col_title = st.columns([1, 4])
+with col_logo:
+    st.image("Assets/metro-atl-speaks.svg", width=350)
+with col_title:
+    st.markdown("""
+    <div style='color: #2364a0; font-size: 40px; font-weight:Semibold ; margin-top: 13px;'>
+        <p>Cross Question Dashboard</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown("""
+    <div style='line-height: 1.5;'>
+        <p>
+            <span style='color: #59595b; font-size: 15px; font-weight:600 ;'>
+            *Mobile view is available via a checkbox in the sidebar.
+            </span>
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+# Question text by question code, and the survey years each question was asked
+question_text = catalog.drop_duplicates("question").set_index("question")
+question_years = catalog.groupby("question")["survey year"].apply(set)
+
+# Order questions by their short text, BIGPROBLEM first as on the other pages
+question_order = sorted(question_text.index, key=lambda q: ("BIGPROBLEM" not in question_text.loc[q, "q_short"], question_text.loc[q, "q_short"]))
+
+col1, col2 = st.columns(2, gap="small")
+with col1:
+    question_a = st.selectbox(
+        "Question A (bars)",
+        question_order,
+        format_func=lambda q: question_text.loc[q, "q_short"],
+        key="cross_question_a",
+        help="Respondents are grouped by their answer to this question")
+with col2:
+    # Question B must have been asked in a year together with question A
+    paired_questions = [q for q in question_order if q != question_a and question_years[q] & question_years[question_a]]
+    question_b = st.selectbox(
+        "Question B (responses)",
+        paired_questions,
+        format_func=lambda q: question_text.loc[q, "q_short"],
+        key="cross_question_b",
+        help="Only questions asked in the same survey year as question A are listed")
+
+shared_years = sorted(question_years[question_a] & question_years[question_b], reverse=True)
+year_options = [str(year) for year in shared_years]
+col1, col2, col3 = st.columns([2, 1, 1], gap="small")
+with col1:
+    selected_year = st.radio(
+        "Select Survey Year",
+        options=year_options,
+        key="cross_year_radio",
+        help="Survey years in which both questions were asked",
+        horizontal=True)
+with col2:
+    selected_demographic = st.selectbox(
+        "Respondents",
+        ["Metro"] + list(DEMO_COL_MAP),
+        help="Limit the table to one demographic group, or use every Metro Atlanta respondent")
+with col3:
+    if selected_demographic == "Metro":
+        selected_group = "All"
+        st.selectbox("Group", ["All"], disabled=True)
+    else:
+        selected_group = st.selectbox("Group", cube.groups(question_a, selected_demographic))
+
+# Weighted two-way table: share of each question A answer giving each question B answer
+cross_table = respondents.crosstab(question_a, question_b, int(selected_year), selected_demographic, selected_group)
+cross_table = cross_table[(cross_table["response_a"] != "DK") & (cross_table["response_b"] != "DK")]
+
+if len(cross_table) > 0:
+    if st.session_state.is_mobile:
+        # Mobile view: Vertical stacked bars with legend below
+        stacked_chart = alt.Chart(cross_table).encode(
+            x=alt.X("response_a:N", title="Question A response", axis=alt.Axis(labelLimit=0, labelAngle=-45)),
+            y=alt.Y("percent:Q", title="Percentage", axis=alt.Axis(format=".0%"), scale=alt.Scale(domain=[0, 1])),
+        )
+        legend_config = alt.Legend(orient="bottom", direction="horizontal", titleOrient="top", columns=2, labelLimit=200)
+    else:
+        # Desktop view: Horizontal stacked bars with legend on right
+        stacked_chart = alt.Chart(cross_table).encode(
+            x=alt.X("percent:Q", title="Percentage", axis=alt.Axis(format=".0%"), scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y("response_a:N", title="Question A response", axis=alt.Axis(labelLimit=0)),
+        )
+        legend_config = alt.Legend(orient="right", titleOrient="top", labelLimit=300)
+
+    cross_chart = (
+        stacked_chart
+        .mark_bar()
+        .encode(
+            color=alt.Color("response_b:N", title="Question B response", scale=alt.Scale(scheme="category20"), legend=legend_config),
+            order=alt.Order("percent:Q", sort="descending"),
+            opacity=alt.condition("datum.suppressed", alt.value(0.3), alt.value(1.0)),
+            tooltip=[
+                alt.Tooltip("response_a", title="Question A"),
+                alt.Tooltip("response_b", title="Question B"),
+                alt.Tooltip("percent", format=".0%"),
+                alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                alt.Tooltip("n", title="Respondents"),
+            ],
+        )
+        .properties(
+            title={
+                "text": textwrap.wrap(question_text.loc[question_b, "q_verb"], width=140),
+                "subtitle": textwrap.wrap(f"By answer to: {question_text.loc[question_a, 'q_verb']} ({selected_year}, {selected_group if selected_demographic != 'Metro' else 'Metro Atlanta'})", width=160),
+                "subtitleFontSize": 12,
+                "subtitleColor": "#666666"
+            },
+            height=600 if st.session_state.is_mobile else alt.Step(20)
+        )
+        .configure_title(
+            subtitlePadding=10
+        )
+    )
+    st.altair_chart(cross_chart, use_container_width=True)
+    st.caption("Note: Only respondents who answered both questions are counted. Don't Know answers are left out, so rows may not sum to 100%.")
+    if cross_table["suppressed"].any():
+        st.caption(f"Faded bars have fewer than {SUPPRESSION.min_n} respondents or an effective sample size below {SUPPRESSION.min_n_eff:g} and are not reliable.")
+
+    with st.expander("Show table"):
+        table = cross_table.pivot(index="response_a", columns="response_b", values="percent").fillna(0)
+        table.index.name = "Question A response"
+        table.columns.name = "Question B response"
+        st.dataframe(table.style.format("{:.0%}"), use_container_width=True)
+else:
+    st.warning("No respondents answered both questions in this year and group.")
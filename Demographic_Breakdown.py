@@ -2,17 +2,19 @@ import pandas as pd
 import altair as alt
 import streamlit as st
 import textwrap
+from mas_data.charts import trend_layers
+from mas_data.schema import DEMO_COL_MAP
+from mas_data.shared import get_snapshot
+from mas_data.significance import ALPHA, change_notes
+from mas_data.stats import SUPPRESSION
 
 st.set_page_config(page_icon="Assets/metro-atl-speaks.svg")
 
-# Cache data loading for better performance
-@st.cache_data
-def load_data():
-    """Load the MAS Dashboard data with caching."""
-    return pd.read_parquet("Data/MAS_Dashboard_Records_2025_Updated.parquet")
-
-# Load data
-df = load_data()
+# Question catalog and aggregate cube are shared by every session; one snapshot per
+# rerun keeps them consistent when the data is reloaded in the background
+snapshot = get_snapshot()
+catalog = snapshot.catalog
+cube = snapshot.cube
 
 custom_css = """
 <style>
@@ -126,7 +128,7 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # Get unique questions from the data
-questions = df["q_short"].unique().tolist()
+questions = catalog["q_short"].unique().tolist()
 # Move BIGPROBLEM question to the front
 bigprob_question = [q for q in questions if "BIGPROBLEM" in q]
 other_questions = [q for q in questions if "BIGPROBLEM" not in q]
@@ -1183,6 +1185,10 @@ for question in questions:
 # Create mapping from display text back to original question
 display_to_question = dict(zip(display_options, questions))
 
+# The Biggest Movers page links here with the question's short text only
+if st.session_state.get('shared_question_text') in questions:
+    st.session_state.shared_question_text = display_options[questions.index(st.session_state.shared_question_text)]
+
 # Initialize widget key with saved value if coming from another page
 if 'demo_question_selectbox' not in st.session_state:
     if 'shared_question_text' in st.session_state and st.session_state.shared_question_text in display_options:
@@ -1203,14 +1209,15 @@ selected_display = st.selectbox(
 
 selected_question = question_map[display_to_question[selected_display]]
 
-# Filter data for selected question
-df_question = df[df["question"] == selected_question].copy()
+# Catalog rows (one per survey year) for the selected question
+question_catalog = catalog[catalog["question"] == selected_question]
 
 # Year filter
-if "survey year" in df_question.columns:
+pooled_years = None
+if "survey year" in question_catalog.columns:
     col1, col2 = st.columns([3,1], gap="small")
     with col1:
-         available_years = sorted(df_question["survey year"].dropna().unique(), reverse=True)
+         available_years = sorted(question_catalog["survey year"].dropna().unique(), reverse=True)
          year_options = [str(year) for year in available_years]
          
          # Initialize widget key with saved value if coming from another page
@@ -1230,7 +1237,21 @@ if "survey year" in df_question.columns:
              key="demo_year_radio",
              on_change=sync_year_selection,
              help="Select which MAS survey year to use for the graph",
+             disabled=st.session_state.get("demo_pool_toggle", False),
              horizontal=True)
+
+         # Pooling adjacent waves narrows the margins of error of small groups such as the smaller counties
+         if len(year_options) > 1:
+             if st.toggle("Pool survey years", key="demo_pool_toggle", help="Combine adjacent survey years into one estimate for the demographic breakdown chart"):
+                 ascending_years = year_options[::-1]
+                 pool_start, pool_end = st.select_slider(
+                     "Survey years to pool",
+                     options=ascending_years,
+                     value=(ascending_years[max(ascending_years.index(selected_year) - 2, 0)], selected_year),
+                     key="demo_pool_range")
+                 if pool_start != pool_end:
+                     pooled_years = tuple(int(year) for year in ascending_years[ascending_years.index(pool_start):ascending_years.index(pool_end) + 1])
+                 selected_year = pool_end
     with col2:
         brkdwn_mode = st.pills(
             "Select Summary Type", 
@@ -1241,11 +1262,11 @@ if "survey year" in df_question.columns:
         if brkdwn_mode == "Topline":
             st.switch_page("Metro_Summary.py")
     
-    # Apply year filter for county breakdown
-    df_year_filtered = df_question[df_question["survey year"] == int(selected_year)].copy()
+    # Apply year filter for county breakdown (the last year when pooling)
+    year_catalog = question_catalog[question_catalog["survey year"] == int(selected_year)]
 
 else:
-    df_year_filtered = df_question.copy()
+    year_catalog = question_catalog
     selected_year = "2025"
 
 # Demographic selection for historical analysis
@@ -1280,20 +1301,7 @@ placeholder_selected_demo_value = st.empty()
 #selected_demographic = st.selectbox("Select demographic for historical analysis", demographic_options)
 
 # Get the actual column name for the selected demographic
-demo_col_map = {
-    "Jurisdiction": "county",
-    "Race": "black or white", 
-    "Hispanic": "latino",
-    "Gender": "gender",
-    "Age": "age group more categories",
-    "Yrs in Metro": "years in metro Atl categorized",
-    "Education": "education",
-    "Income": "income",
-    "Homeownership": "homeownership",
-    "Employment": "employment status",
-    "Work Setting": "remote worker status"
-}
-demo_column = demo_col_map[selected_demographic]
+demo_column = DEMO_COL_MAP[selected_demographic]
 
 excluded_demographics = {
     "Hispanic": ["DK"],
@@ -1372,66 +1380,24 @@ demo_grp_rename = {
     }
 }
 
-# Demographic value selection for historical analysis
-if demo_column in df_question.columns:
-    demo_values = df_question[demo_column].dropna().unique().tolist()
-    # Add Atlanta to county options if it's not already there
-    if selected_demographic == "Jurisdiction" and "Atlanta" not in demo_values:
-        demo_values.append("Atlanta")
-else:
-    demo_values = []
-    selected_demo_value = None
+# Demographic value selection for historical analysis (includes Atlanta under Jurisdiction)
+demo_values = cube.groups(selected_question, selected_demographic)
 
-if len(df_year_filtered) > 0:
+if len(year_catalog) > 0:
     
     # --- Demographic Breakdown Chart ---
     
-    if demo_column in df_year_filtered.columns:
-        # Create demographic breakdown with Atlanta only for Jurisdiction demographic
-        county_data = []
-        
-        # Process ALL demographic groups using countywt
-        if len(df_year_filtered) > 0:
-            regular_crosstab = (
-                df_year_filtered.groupby([demo_column, "response"])["countywt"]
-                .sum()
-                .reset_index()
-            )
-            county_data.append(regular_crosstab)
-        
-        # Process Atlanta using atlwt ONLY if Jurisdiction is selected
-        if (selected_demographic == "Jurisdiction" and 
-            "atlanta resident" in df_year_filtered.columns and 
-            "atlwt" in df_year_filtered.columns):
-            atlanta_data = df_year_filtered[df_year_filtered["atlanta resident"] == "Yes"].copy()
-            if len(atlanta_data) > 0:
-                atlanta_crosstab = (
-                    atlanta_data.groupby(["response"])["atlwt"]
-                    .sum()
-                    .reset_index()
-                )
-                # Add Atlanta as the county name
-                atlanta_crosstab[demo_column] = "Atlanta"
-                # Reorder columns to match regular counties
-                atlanta_crosstab = atlanta_crosstab[[demo_column, "response", "atlwt"]]
-                # Rename atlwt to countywt for consistency
-                atlanta_crosstab = atlanta_crosstab.rename(columns={"atlwt": "countywt"})
-                county_data.append(atlanta_crosstab)
-        
-        # Combine all demographic data
-        if county_data:
-            county_crosstab = pd.concat(county_data, ignore_index=True)
-            
-            # Calculate percentages within each demographic group
-            county_crosstab["percent"] = (
-                county_crosstab.groupby(demo_column)["countywt"]
-                .transform(lambda x: x / x.sum())
-            )
-        else:
-            county_crosstab = pd.DataFrame()
-    else:
+    # Weighted sums and percentages within each demographic group are precomputed in the
+    # aggregate cube. Under Jurisdiction it also holds Atlanta residents, weighted by atlwt.
+    # Pooled years are combined from the cube's sums, with each year's weights rescaled.
+    crosstab_year = pooled_years or int(selected_year)
+    year_label = f"{pooled_years[0]}–{pooled_years[-1]} pooled" if pooled_years else selected_year
+    county_crosstab = (
+        cube.crosstab(selected_question, crosstab_year, selected_demographic)
+        .rename(columns={"group": demo_column})
+    )
+    if len(county_crosstab) == 0:
         st.warning(f"{selected_demographic} data not available for this question.")
-        county_crosstab = pd.DataFrame()
     
     # Apply custom configurations if available for the selected year only
     # If no year-specific config exists, use Altair defaults
@@ -1515,6 +1481,28 @@ if len(df_year_filtered) > 0:
                 if selected_demographic in config["exclude_demographics"]:
                     excluded_groups = config["exclude_demographics"][selected_demographic]
                     county_crosstab = county_crosstab[~county_crosstab[chart_column].isin(excluded_groups)]
+
+        # Groups too small to report are flagged in the cube; leave them out of the chart
+        suppressed_groups = county_crosstab.loc[county_crosstab["suppressed"], chart_column].unique().tolist()
+        county_crosstab = county_crosstab[~county_crosstab["suppressed"]]
+
+        # Between-group tests are memoized beside the crosstab and cover only the groups and
+        # responses shown in the chart. A segment is marked when the group's share differs
+        # significantly from another group shown.
+        hidden_groups = set(excluded_demographics.get(selected_demographic, []))
+        hidden_responses = set(config.get("exclude_responses", []))
+        group_test = cube.chi_square(selected_question, crosstab_year, selected_demographic, hidden_groups, hidden_responses)
+        group_pairs = cube.pairwise(selected_question, crosstab_year, selected_demographic, hidden_groups, hidden_responses)
+        group_pairs = group_pairs[group_pairs["significant"]]
+        if not group_test.p_value < ALPHA:
+            group_pairs = group_pairs.iloc[0:0]
+        group_pairs = group_pairs.sort_values("other_group", key=lambda groups: groups.map({grp: i for i, grp in enumerate(demo_grp_order.get(selected_demographic, []))}))
+        group_pairs["other_display"] = group_pairs["other_group"].map(demo_grp_rename.get(selected_demographic, {})).fillna(group_pairs["other_group"])
+        for direction, pairs in [("higher_than", group_pairs[group_pairs["difference"] > 0]), ("lower_than", group_pairs[group_pairs["difference"] < 0])]:
+            listed = pairs.groupby(["group", "response"])["other_display"].agg(", ".join).rename(direction)
+            county_crosstab = county_crosstab.merge(listed, left_on=[chart_column, "response"], right_index=True, how="left")
+        county_crosstab["significant"] = county_crosstab["higher_than"].notna() | county_crosstab["lower_than"].notna()
+        county_crosstab[["higher_than", "lower_than"]] = county_crosstab[["higher_than", "lower_than"]].fillna("")
         
         # Apply demographic group renaming and ordering
         if selected_demographic in demo_grp_rename:
@@ -1543,7 +1531,7 @@ if len(df_year_filtered) > 0:
         # Configure chart orientation based on mobile/desktop view
         if st.session_state.is_mobile:
             # Mobile view: Vertical stacked bars with legend below
-            stacked_chart = alt.Chart(county_crosstab.round(2)).encode(
+            stacked_chart = alt.Chart(county_crosstab.round({"percent": 2})).encode(
                 x=alt.X(f"{chart_display_column}:N", title=selected_demographic,
                         axis=alt.Axis(labelLimit=0, labelAngle=-45), sort=demo_sort_order),
                 y=alt.Y("percent:Q", title="Percentage", axis=alt.Axis(format=".0%"), scale=alt.Scale(domain=[0, 1])),
@@ -1557,7 +1545,7 @@ if len(df_year_filtered) > 0:
             )
         else:
             # Desktop view: Horizontal stacked bars with legend on right
-            stacked_chart = alt.Chart(county_crosstab.round(2)).encode(
+            stacked_chart = alt.Chart(county_crosstab.round({"percent": 2})).encode(
                 x=alt.X("percent:Q", title="Percentage", axis=alt.Axis(format=".0%"), scale=alt.Scale(domain=[0, 1])),
                 y=alt.Y(f"{chart_display_column}:N", title=selected_demographic,
                         axis=alt.Axis(labelLimit=0), sort=demo_sort_order),
@@ -1583,15 +1571,20 @@ if len(df_year_filtered) > 0:
                 tooltip=[
                     alt.Tooltip(chart_display_column, title=selected_demographic),
                     alt.Tooltip(response_column, title="Response"), 
-                    alt.Tooltip("percent", format=".0%")
+                    alt.Tooltip("percent", format=".0%"),
+                    alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                    alt.Tooltip("higher_than", title="Significantly higher than"),
+                    alt.Tooltip("lower_than", title="Significantly lower than")
                 ],
-                opacity=alt.condition(selection, alt.value(1.0), alt.value(0.7))
+                opacity=alt.condition(selection, alt.value(1.0), alt.value(0.7)),
+                stroke=alt.condition("datum.significant", alt.value("#222222"), alt.value(None)),
+                strokeWidth=alt.condition("datum.significant", alt.value(1.5), alt.value(0))
             )
             .add_selection(selection)
             .properties(
                 title={
-                    "text":textwrap.wrap(f"{df_year_filtered['q_verb'].iloc[0] if 'q_verb' in df_year_filtered.columns else selected_question}", width=140),
-                    "subtitle":f"Response by {selected_demographic} Demographic ({selected_year})",
+                    "text":textwrap.wrap(f"{year_catalog['q_verb'].iloc[0] if 'q_verb' in year_catalog.columns else selected_question}", width=140),
+                    "subtitle":f"Response by {selected_demographic} Demographic ({year_label})",
                     "subtitleFontSize": 12,
                     "subtitleColor": "#666666"
                 },
@@ -1633,7 +1626,16 @@ if len(df_year_filtered) > 0:
         chart_event = st.altair_chart(county_chart, use_container_width=True, on_select="rerun", selection_mode="single")
         
         # Add footer note below the chart
-        st.caption("Note: Remaining percentages are either Don't Know or Not Available. Percentages may vary slightly from those reported in other MAS products, go to FAQ for more details.")
+        st.caption("Note: Remaining percentages are either Don't Know or Not Available. Percentages may vary slightly from those reported in other MAS products, go to FAQ for more details. Hover over a bar for its 95% margin of error.")
+        if pooled_years:
+            st.caption(f"Pooled estimates combine the {', '.join(map(str, pooled_years))} surveys, each year's weights rescaled to its number of respondents.")
+        if group_test.p_value < ALPHA:
+            st.caption(f"Responses differ significantly across {selected_demographic} groups (design-adjusted chi-square, p {'< 0.001' if group_test.p_value < 0.001 else f'= {group_test.p_value:.3f}'}). Outlined segments are significantly higher or lower than at least one other group at the 95% level; hover over one to see which.")
+        elif group_test.p_value >= ALPHA:
+            st.caption(f"Differences between {selected_demographic} groups are not statistically significant (design-adjusted chi-square, p = {group_test.p_value:.2f}).")
+        if suppressed_groups:
+            hidden = ", ".join(demo_grp_rename.get(selected_demographic, {}).get(grp, grp) for grp in suppressed_groups)
+            st.caption(f"Not shown: {hidden} (fewer than {SUPPRESSION.min_n} respondents or an effective sample size below {SUPPRESSION.min_n_eff:g}).")
         # Get selected demographic from chart interaction
         if chart_event and chart_event['selection']['single']:
             try:
@@ -1665,38 +1667,11 @@ if len(df_year_filtered) > 0:
         #selected_demo_value = st.selectbox(f"Select {selected_demographic} for historical analysis", demo_values)
         selected_demo_value = None
 
-    if demo_column in df_question.columns and selected_demo_value:
-        # Handle Atlanta as special case for county analysis
-        if selected_demographic == "Jurisdiction" and selected_demo_value == "Atlanta":
-            # Filter for Atlanta residents using atlanta resident column
-            if "atlanta resident" in df_question.columns and "atlwt" in df_question.columns:
-                df_demo_filtered = df_question[df_question["atlanta resident"] == "Yes"].copy()
-                weight_column = "atlwt"
-            else:
-                st.warning("Atlanta resident data or atlwt column not available.")
-                df_demo_filtered = pd.DataFrame()
-                weight_column = "countywt"
-        else:
-            # Regular demographic filtering
-            df_demo_filtered = df_question[df_question[demo_column] == selected_demo_value].copy()
-            weight_column = "countywt"
-        
-        if len(df_demo_filtered) > 0 and "survey year" in df_demo_filtered.columns:
-            # Calculate historical trends for the selected demographic
-            historical_trend = (
-                df_demo_filtered.groupby(["survey year", "response"])[weight_column]
-                .sum()
-                .reset_index()
-            )
-            
-            # Calculate percentages within each year
-            historical_trend["percent"] = (
-                historical_trend.groupby("survey year")[weight_column]
-                .transform(lambda x: x / x.sum())
-            )
-        else:
+    if selected_demo_value:
+        # Historical trend for the selected group (Atlanta uses atlwt), looked up from the cube
+        historical_trend = cube.trend(selected_question, selected_demographic, selected_demo_value)
+        if len(historical_trend) == 0:
             st.warning(f"No historical data available for {selected_demographic}.")
-            historical_trend = pd.DataFrame()
     else:
         #st.warning(f"{selected_demographic} data not available for historical analysis because of demographic.")
         historical_trend = pd.DataFrame()
@@ -1711,9 +1686,11 @@ if len(df_year_filtered) > 0:
         else:
             hist_config = {}  # Use Altair defaults
         
-        # Filter out excluded responses
+        # Filter out excluded responses and years in which the group is too small to report
         if "exclude_responses" in hist_config:
             historical_trend = historical_trend[~historical_trend["response"].isin(hist_config["exclude_responses"])]
+        suppressed_years = sorted(historical_trend.loc[historical_trend["suppressed"], "survey year"].unique().tolist())
+        historical_trend = historical_trend[~historical_trend["suppressed"]]
         
         # Apply response aliases if available
         if "response_aliases" in hist_config:
@@ -1764,9 +1741,10 @@ if len(df_year_filtered) > 0:
                 titleOrient="top"
             )
         
-        historical_chart = (
-            alt.Chart(historical_trend.round(2))
-            .mark_line(point=True, strokeWidth=3)
+        # Changes since the previous survey year are tested in the cube lookup; significant ones get a diamond
+        historical_trend["change_note"] = change_notes(historical_trend)
+        historical_base = (
+            alt.Chart(historical_trend.round({"percent": 2}))
             .encode(
                 x=alt.X(
                     "survey year:T", 
@@ -1779,9 +1757,14 @@ if len(df_year_filtered) > 0:
                 tooltip=[
                     alt.Tooltip("survey year:T", format="%Y", title="Survey Year", timeUnit='utcyear'),
                     alt.Tooltip("response_display", title="Response"),
-                    alt.Tooltip("percent", format=".0%", title="Percentage")
+                    alt.Tooltip("percent", format=".0%", title="Percentage"),
+                    alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                    alt.Tooltip("change_note", title="Change since previous survey")
                 ]
             )
+        )
+        historical_chart = (
+            trend_layers(historical_base, strokeWidth=3)
             .properties(
                 title=f"Historic Response Trends: {selected_demo_value} ({selected_demographic.title()})",
                 height=400
@@ -1789,7 +1772,67 @@ if len(df_year_filtered) > 0:
         )
         
         st.altair_chart(historical_chart, use_container_width=True)
+        st.caption("Diamonds mark changes from the previous survey year that are statistically significant at the 95% level.")
         st.info("📊 The Historic Response Trends chart shows trends across ALL survey years, regardless of the year filter above.")
+        if suppressed_years:
+            st.caption(f"Not shown: {', '.join(map(str, suppressed_years))}, with too few {demo_grp_rename.get(selected_demographic, {}).get(selected_demo_value, selected_demo_value)} respondents to report.")
+
+        # --- Compare Groups ---
+        # Every group's trend is precomputed in the cube, so comparing groups is a single lookup
+        compare_col1, compare_col2 = st.columns([1, 2], gap="small")
+        with compare_col1:
+            compare_response = st.selectbox(
+                "Response to compare",
+                historical_trend["response_display"].unique().tolist(),
+                key="demo_compare_response",
+                help="Chart this response's share for several groups at once")
+        with compare_col2:
+            compare_options = [grp for grp in demo_values if grp not in excluded_demographics.get(selected_demographic, [])]
+            compare_groups = st.multiselect(
+                f"{selected_demographic} groups to compare",
+                compare_options,
+                default=[selected_demo_value] if selected_demo_value in compare_options else None,
+                format_func=lambda grp: demo_grp_rename.get(selected_demographic, {}).get(grp, grp),
+                key=f"demo_compare_groups_{selected_demographic}_{selected_demo_value}")
+
+        group_trends = cube.trends(selected_question, selected_demographic)
+        group_trends["response_display"] = group_trends["response"].map(hist_config.get("response_aliases", {})).fillna(group_trends["response"])
+        group_trends = group_trends[
+            group_trends["group"].isin(compare_groups) & (group_trends["response_display"] == compare_response) & ~group_trends["suppressed"]
+        ]
+
+        if len(group_trends) > 0:
+            group_trends["group_display"] = group_trends["group"].map(demo_grp_rename.get(selected_demographic, {})).fillna(group_trends["group"])
+            group_trends["survey year"] = group_trends["survey year"].astype(str)
+            group_trends["change_note"] = change_notes(group_trends)
+            compare_base = (
+                alt.Chart(group_trends.round({"percent": 2}))
+                .encode(
+                    x=alt.X(
+                        "survey year:T",
+                        title="Survey Year",
+                        axis=alt.Axis(tickCount="year"),
+                        scale=alt.Scale(domain=[start_date, end_date]),
+                    ),
+                    y=alt.Y("percent:Q", title="Percentage", axis=alt.Axis(format=".0%")),
+                    color=alt.Color("group_display:N", title=selected_demographic, scale=alt.Scale(scheme="category10"), legend=hist_legend_config),
+                    tooltip=[
+                        alt.Tooltip("survey year:T", format="%Y", title="Survey Year", timeUnit='utcyear'),
+                        alt.Tooltip("group_display", title=selected_demographic),
+                        alt.Tooltip("percent", format=".0%", title="Percentage"),
+                        alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                        alt.Tooltip("change_note", title="Change since previous survey")
+                    ]
+                )
+            )
+            compare_chart = (
+                trend_layers(compare_base, strokeWidth=3)
+                .properties(
+                    title=f"Historic Trend of \"{compare_response}\" by {selected_demographic}",
+                    height=400
+                )
+            )
+            st.altair_chart(compare_chart, use_container_width=True)
         
     elif question_hist[selected_question] == 1 and selected_demo_value == None:
         with placeholder_selected_demo_value.container():
@@ -1797,6 +1840,77 @@ if len(df_year_filtered) > 0:
     else:
         st.info("Selected question does not have historical data or has no valid time series data.")
    
+
+    # --- Two-Way Demographic Breakdown ---
+    if len(county_crosstab) > 0 and pooled_years:
+        st.markdown("---")
+        st.caption("Two-way breakdowns are shown for single survey years. Turn off pooling to see them.")
+    elif len(county_crosstab) > 0:
+        st.markdown("---")
+        second_options = ["None"] + [demo for demo in demographic_options if demo != selected_demographic]
+        second_demographic = st.selectbox(
+            f"Break {selected_demographic} down further by",
+            second_options,
+            key="demo_second_selectbox",
+            help="Show responses for every combination of two demographic groups, e.g. Race by Homeownership")
+
+        if second_demographic != "None":
+            # Pairs of groups are aggregated in one pass over the respondent matrix and cached
+            # for every session. Jurisdiction groups are counties here, without the City of Atlanta.
+            pair_crosstab = snapshot.respondents.breakdown(selected_question, int(selected_year), selected_demographic, second_demographic)
+            for demo, column in [(selected_demographic, "group"), (second_demographic, "second_group")]:
+                if demo in excluded_demographics:
+                    pair_crosstab = pair_crosstab[~pair_crosstab[column].isin(excluded_demographics[demo])]
+                pair_crosstab[f"{column}_display"] = pair_crosstab[column].map(demo_grp_rename.get(demo, {})).fillna(pair_crosstab[column])
+            if "exclude_responses" in config:
+                pair_crosstab = pair_crosstab[~pair_crosstab["response"].isin(config["exclude_responses"])]
+            pair_crosstab["response_display"] = pair_crosstab["response"].map(config.get("response_aliases", {})).fillna(pair_crosstab["response"])
+            pair_crosstab["pair"] = pair_crosstab["group_display"] + " · " + pair_crosstab["second_group_display"]
+
+            # Order pairs by the first demographic's group order, then the second's
+            def group_rank(demo, groups):
+                order = {grp: i for i, grp in enumerate(demo_grp_order.get(demo, []))}
+                return groups.map(order).fillna(len(order))
+            pair_crosstab = pair_crosstab.sort_values(["group", "second_group"], key=lambda groups: group_rank(
+                selected_demographic if groups.name == "group" else second_demographic, groups))
+            pair_sort_order = pair_crosstab["pair"].unique().tolist()
+
+            if len(pair_crosstab) > 0:
+                pair_chart = (
+                    alt.Chart(pair_crosstab.round({"percent": 2}))
+                    .mark_bar()
+                    .encode(
+                        x=alt.X("percent:Q", title="Percentage", axis=alt.Axis(format=".0%"), scale=alt.Scale(domain=[0, 1])),
+                        y=alt.Y("pair:N", title=f"{selected_demographic} · {second_demographic}", axis=alt.Axis(labelLimit=0), sort=pair_sort_order),
+                        color=alt.Color(f"{response_column}:N", title="Response", scale=color_scale, sort=sort_order, legend=legend_config),
+                        order=alt.Order("percent:Q", sort="descending"),
+                        opacity=alt.condition("datum.suppressed", alt.value(0.3), alt.value(1.0)),
+                        tooltip=[
+                            alt.Tooltip("group_display", title=selected_demographic),
+                            alt.Tooltip("second_group_display", title=second_demographic),
+                            alt.Tooltip("response_display", title="Response"),
+                            alt.Tooltip("percent", format=".0%"),
+                            alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                            alt.Tooltip("group_n", title="Respondents"),
+                        ],
+                    )
+                    .properties(
+                        title={
+                            "text": f"Response by {selected_demographic} and {second_demographic} ({selected_year})",
+                            "subtitle": f"Faded bars have fewer than {SUPPRESSION.min_n} respondents or an effective sample size below {SUPPRESSION.min_n_eff:g} and are not reliable",
+                            "subtitleFontSize": 12,
+                            "subtitleColor": "#666666"
+                        },
+                        height=alt.Step(20)
+                    )
+                    .configure_title(
+                        subtitlePadding=10
+                    )
+                )
+                st.altair_chart(pair_chart, use_container_width=True)
+            else:
+                st.warning(f"No respondents in any {selected_demographic} and {second_demographic} combination for this question.")
+
 else:
     st.info("No data available for the selected filters.")
 
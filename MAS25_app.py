@@ -1,4 +1,4 @@
 import streamlit as st
 
-pg = st.navigation([st.Page("Metro_Summary.py"), st.Page("Demographic_Breakdown.py"), st.Page("FAQ.py")], position="top", expanded=True)
+pg = st.navigation([st.Page("Metro_Summary.py"), st.Page("Demographic_Breakdown.py"), st.Page("Cross_Question.py"), st.Page("Biggest_Movers.py"), st.Page("FAQ.py")], position="top", expanded=True)
 pg.run()
\ No newline at end of file
@@ -1,20 +1,20 @@
-import pandas as pd
 import altair as alt
 import streamlit as st
 import textwrap
+from mas_data.charts import trend_layers
+from mas_data.shared import get_snapshot
+from mas_data.significance import change_notes
+from mas_data.stats import confidence_interval
 import streamlit.components.v1 as components
 
 st.set_page_config(page_icon="Assets/metro-atl-speaks.svg")
 st.set_page_config(initial_sidebar_state="collapsed")
 
-# Cache data loading for better performance
-@st.cache_data
-def load_data():
-    """Load the MAS Dashboard data with caching."""
-    return pd.read_parquet("Data/MAS_Dashboard_Records_2025_Updated.parquet")
-
-# Load data
-df = load_data()
+# Question catalog and aggregate cube are shared by every session; one snapshot per
+# rerun keeps them consistent when the data is reloaded in the background
+snapshot = get_snapshot()
+catalog = snapshot.catalog
+cube = snapshot.cube
 #st.set_page_config(layout="wide")
 
 custom_css = """
@@ -175,7 +175,7 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # Get unique questions from the data
-questions = df["q_short"].unique().tolist()
+questions = catalog["q_short"].unique().tolist()
 # Move BIGPROBLEM question to the front
 bigprob_question = [q for q in questions if "BIGPROBLEM" in q]
 other_questions = [q for q in questions if "BIGPROBLEM" not in q]
@@ -1231,6 +1231,10 @@ for question in questions:
 # Create mapping from display text back to original question
 display_to_question = dict(zip(display_options, questions))
 
+# The Biggest Movers page links here with the question's short text only
+if st.session_state.get('shared_question_text') in questions:
+    st.session_state.shared_question_text = display_options[questions.index(st.session_state.shared_question_text)]
+
 # Initialize widget key with saved value if coming from another page
 if 'metro_question_selectbox' not in st.session_state:
     if 'shared_question_text' in st.session_state and st.session_state.shared_question_text in display_options:
@@ -1251,14 +1255,14 @@ selected_display = st.selectbox(
 
 selected_question = question_map[display_to_question[selected_display]]
 
-# Filter data for selected question
-df_question = df[df["question"] == selected_question].copy()
+# Catalog rows (one per survey year) for the selected question
+question_catalog = catalog[catalog["question"] == selected_question]
 
 # Year filter
-if "survey year" in df_question.columns:
+if "survey year" in question_catalog.columns:
     col1, col2 = st.columns([3,1], gap="small")
     with col1:
-        available_years = sorted(df_question["survey year"].dropna().unique(), reverse=True)
+        available_years = sorted(question_catalog["survey year"].dropna().unique(), reverse=True)
         year_options = [str(year) for year in available_years]
         
         # Initialize widget key with saved value if coming from another page
@@ -1291,19 +1295,16 @@ if "survey year" in df_question.columns:
             st.switch_page("Demographic_Breakdown.py")
 
     # Apply year filter for non-trend analysis
-    df_filtered = df_question[df_question["survey year"] == int(selected_year)].copy()
+    year_catalog = question_catalog[question_catalog["survey year"] == int(selected_year)]
 
 else:
-    df_filtered = df_question[df_question["survey year"] == "2025"].copy()
+    year_catalog = question_catalog[question_catalog["survey year"] == "2025"]
     selected_year = "2025"
 
 # --- Response Distribution ---
-response_summary = (
-    df_filtered.groupby("response")["countywt"]
-    .sum()
-    .reset_index()
-)
-response_summary["percent"] = (response_summary["countywt"] / response_summary["countywt"].sum())
+# Weighted sums, percentages and margins of error are precomputed in the aggregate cube
+response_summary = cube.distribution(selected_question, int(selected_year))
+response_summary["ci_low"], response_summary["ci_high"] = confidence_interval(response_summary["percent"], response_summary["moe"])
 
 # Apply custom configurations if available for the selected year only
 # If no year-specific config exists, use Altair defaults
@@ -1355,7 +1356,7 @@ if st.session_state.is_mobile:
     )
     
     response_chart = (
-        alt.Chart(response_summary.round(2))
+        alt.Chart(response_summary.round({"percent": 2}))
         .mark_bar()
         .encode(
             x=alt.X("response_display:N", title="Response", sort=sort_order,
@@ -1364,12 +1365,13 @@ if st.session_state.is_mobile:
             color=alt.Color("response_display:N", legend=legend_config, scale=color_scale, sort=sort_order),
             tooltip=[
                 alt.Tooltip("response_display", title="Response"),
-                alt.Tooltip("percent", format=".0%", title="Percentage")
+                alt.Tooltip("percent", format=".0%", title="Percentage"),
+                alt.Tooltip("moe", format=".1%", title="Margin of error (±)")
             ]
         )
         .properties(
             title={
-                "text": textwrap.wrap(f"{df_filtered['q_verb'].iloc[0] if 'q_verb' in df_filtered.columns else selected_question}", width=50),
+                "text": textwrap.wrap(f"{year_catalog['q_verb'].iloc[0] if 'q_verb' in year_catalog.columns else selected_question}", width=50),
                 "fontSize": 16,
                 "fontStyle": "italic",
                 "fontWeight": 400,
@@ -1379,9 +1381,20 @@ if st.session_state.is_mobile:
         )
     )
     
-    # Create labels for vertical bars
+    # 95% confidence intervals as error bars
+    response_chart_error = (
+        alt.Chart(response_summary.round({"percent": 2}))
+        .mark_rule(color="#59595b")
+        .encode(
+            x=alt.X("response_display:N", title="Response", sort=sort_order),
+            y=alt.Y("ci_low:Q", title="Percentage"),
+            y2="ci_high:Q"
+        )
+    )
+
+    # Create labels for vertical bars, above the error bars
     response_chart_label = (
-        alt.Chart(response_summary.round(2))
+        alt.Chart(response_summary.round({"percent": 2}))
         .mark_text(
             align="center",
             baseline="bottom",
@@ -1389,7 +1402,7 @@ if st.session_state.is_mobile:
         )
         .encode(
             x=alt.X("response_display:N", title="Response", sort=sort_order),
-            y=alt.Y("percent:Q", title="Percentage"),
+            y=alt.Y("ci_high:Q", title="Percentage"),
             color=alt.Color("response:N", legend=None, scale=color_scale),
             text=alt.Text("percent:Q", format=".0%")
         )
@@ -1397,7 +1410,7 @@ if st.session_state.is_mobile:
 else:
     # Horizontal bar chart for desktop
     response_chart = (
-        alt.Chart(response_summary.round(2))
+        alt.Chart(response_summary.round({"percent": 2}))
         .mark_bar()
         .encode(
             x=alt.X("percent:Q", title="Percentage", axis=alt.Axis(format=".0%")),
@@ -1406,12 +1419,13 @@ else:
             color=alt.Color("response:N", legend=None, scale=color_scale),
             tooltip=[
                 alt.Tooltip("response_display", title="Response"),
-                alt.Tooltip("percent", format=".0%", title="Percentage")
+                alt.Tooltip("percent", format=".0%", title="Percentage"),
+                alt.Tooltip("moe", format=".1%", title="Margin of error (±)")
             ]
         )
         .properties(
             title={
-                "text": textwrap.wrap(f"{df_filtered['q_verb'].iloc[0] if 'q_verb' in df_filtered.columns else selected_question}", width=130),
+                "text": textwrap.wrap(f"{year_catalog['q_verb'].iloc[0] if 'q_verb' in year_catalog.columns else selected_question}", width=130),
                 "fontSize": 18,
                 "fontStyle": "italic",
                 "fontWeight": 400,
@@ -1420,16 +1434,27 @@ else:
         )
     )
     
-    # Create labels for horizontal bars
+    # 95% confidence intervals as error bars
+    response_chart_error = (
+        alt.Chart(response_summary.round({"percent": 2}))
+        .mark_rule(color="#59595b")
+        .encode(
+            x=alt.X("ci_low:Q", title="Percentage"),
+            x2="ci_high:Q",
+            y=alt.Y("response_display:N", title="Response", sort=sort_order)
+        )
+    )
+
+    # Create labels for horizontal bars, right of the error bars
     response_chart_label = (
-        alt.Chart(response_summary.round(2))
+        alt.Chart(response_summary.round({"percent": 2}))
         .mark_text(
             align="left",
             baseline="middle",
             dx=3  # Nudges text to the right
         )
         .encode(
-            x=alt.X("percent:Q", title="Percentage"),
+            x=alt.X("ci_high:Q", title="Percentage"),
             y=alt.Y("response_display:N", title="Response", sort=sort_order),
             color=alt.Color("response:N", legend=None, scale=color_scale),
             text=alt.Text("percent:Q", format=".0%")
@@ -1441,8 +1466,10 @@ st.markdown(f"""
         <p>{selected_year} Response Distribution</p>
     </div>
     """, unsafe_allow_html=True)
-st.altair_chart(response_chart + response_chart_label, use_container_width=True)
-st.caption("Note: Remaining percentages are either Don't Know or Not Available.  Percentages may vary slightly from those reported in other MAS products, go to FAQ for more details.")
+st.altair_chart(response_chart + response_chart_error + response_chart_label, use_container_width=True)
+st.caption("Note: Remaining percentages are either Don't Know or Not Available.  Percentages may vary slightly from those reported in other MAS products, go to FAQ for more details. Error bars show 95% confidence intervals based on the weighted effective sample size.")
+if response_summary["suppressed"].any():
+    st.warning("Too few respondents answered this question in this year for reliable percentages.")
 if st.session_state.is_mobile is False:
     st.markdown("""
                 <span style='color: #59595b; font-size: 15px; font-weight:600 ;'>
@@ -1453,20 +1480,9 @@ if st.session_state.is_mobile is False:
 
 st.markdown("---")  # Add a separator line
 # --- Year-over-Year Trends ---
-if "survey year" in df_question.columns and question_hist[selected_question] == 1:
-    # Use df_question (not df_filtered) to show all years regardless of year filter
-    # But apply demographic filter if one is selected
-    year_trend = (
-        df_question.groupby(["survey year", "response"])["countywt"]
-        .sum()
-        .reset_index()
-    )
-    
-    # Calculate percentages within each year
-    year_trend["percent"] = (
-        year_trend.groupby("survey year")["countywt"]
-        .transform(lambda x: x / x.sum())
-    )
+if "survey year" in question_catalog.columns and question_hist[selected_question] == 1:
+    # Show all years regardless of year filter, with percentages within each year
+    year_trend = cube.trend(selected_question)
     
     # Apply the same custom configurations as the main response chart
     # Use 2025 configuration for year-over-year trends
@@ -1476,9 +1492,10 @@ if "survey year" in df_question.columns and question_hist[selected_question] ==
     else:
         config = {}  # Use Altair defaults
     
-    # Filter out excluded responses
+    # Filter out excluded responses and years with too few respondents to report
     if "exclude_responses" in config:
         year_trend = year_trend[~year_trend["response"].isin(config["exclude_responses"])]
+    year_trend = year_trend[~year_trend["suppressed"]]
     
     # Apply response aliases if available
     if "response_aliases" in config:
@@ -1535,9 +1552,10 @@ if "survey year" in df_question.columns and question_hist[selected_question] ==
             titleOrient="top"
         )
     
-    trend_chart = (
-        alt.Chart(year_trend.round(2))
-        .mark_line(point=True)
+    # Changes since the previous survey year are tested in the cube lookup; significant ones get a diamond
+    year_trend["change_note"] = change_notes(year_trend)
+    trend_base = (
+        alt.Chart(year_trend.round({"percent": 2}))
         .encode(
             x=alt.X(
                 "survey year:T", 
@@ -1550,9 +1568,14 @@ if "survey year" in df_question.columns and question_hist[selected_question] ==
             tooltip=[
                 alt.Tooltip("survey year:T", format="%Y", title="Survey Year", timeUnit='utcyear'), 
                 alt.Tooltip("response_display", title="Response"), 
-                alt.Tooltip("percent", format=".0%", title="Percentage")
+                alt.Tooltip("percent", format=".0%", title="Percentage"),
+                alt.Tooltip("moe", format=".1%", title="Margin of error (±)"),
+                alt.Tooltip("change_note", title="Change since previous survey")
             ]
         )
+    )
+    trend_chart = (
+        trend_layers(trend_base)
         .properties(
             title="Response Trends Over Time (All Years)"
         )
@@ -1565,7 +1588,7 @@ if "survey year" in df_question.columns and question_hist[selected_question] ==
     """, unsafe_allow_html=True)
 
     st.altair_chart(trend_chart, use_container_width=True)
-    st.caption("Note: Remaining percentages are either Don't Know or Not Available.")
+    st.caption("Note: Remaining percentages are either Don't Know or Not Available. Diamonds mark changes from the previous survey year that are statistically significant at the 95% level.")
     st.info("📊 This chart shows trends across ALL survey years, regardless of the year filter above.")
 else:
     st.markdown(f"""
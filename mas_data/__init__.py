@@ -0,0 +1,16 @@
+"""Data access helpers for the MAS 2025 dashboard pages."""
+
+from .dataset import RecordsDataset, load_dataset
+from .loader import compact_table, load_records
+from .schema import DASHBOARD_COLUMNS, DEMOGRAPHIC_PAGE_COLUMNS, METRO_COLUMNS, RECORDS_PATH
+
+__all__ = [
+    "RecordsDataset",
+    "compact_table",
+    "load_dataset",
+    "load_records",
+    "DASHBOARD_COLUMNS",
+    "DEMOGRAPHIC_PAGE_COLUMNS",
+    "METRO_COLUMNS",
+    "RECORDS_PATH",
+]
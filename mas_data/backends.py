@@ -0,0 +1,197 @@
+"""Interchangeable engines for the weighted crosstab behind the aggregate cube.
+
+:func:`mas_data.cube.build_cube` reduces every grouping set to integer-coded
+rows (question, survey year, group and response codes plus a weight). A
+backend does the two aggregation steps on those rows:
+
+- ``crosstab``: the row count, weight sum and squared-weight sum of every
+  key combination (the last one gives the effective sample size, see
+  ``mas_data.stats``)
+- ``normalize``: each weight sum as a share of its total within some keys
+
+Available backends:
+
+- ``numpy`` (default): dense ``bincount`` over flat cell indices
+- ``pandas``: ``groupby``, the reference implementation
+- ``arrow``: PyArrow compute hash aggregation
+- ``duckdb``: embedded DuckDB SQL; needs the optional ``duckdb`` package
+
+Choose one with the ``MAS_AGGREGATION_BACKEND`` environment variable or
+``python -m mas_data.build --backend``. ``tests/test_backends.py`` checks
+every installed backend against pandas; ``python -m mas_data.backends``
+times them on the records.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DEFAULT_BACKEND = os.environ.get("MAS_AGGREGATION_BACKEND", "numpy")
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised when a backend's optional dependency is not installed."""
+
+
+def _frame(keys, **columns):
+    return pd.DataFrame({**{name: np.asarray(values) for name, values in keys.items()}, **columns})
+
+
+class NumpyBackend:
+    """Weighted ``bincount`` over key combinations numbered in a dense array.
+
+    The array has one cell per possible combination of key codes, so it
+    suits small code ranges like the survey's questions, years and groups.
+    """
+
+    name = "numpy"
+
+    @staticmethod
+    def _cells(arrays):
+        shape = tuple(int(values.max(initial=-1)) + 1 for values in arrays)
+        return np.ravel_multi_index([values.astype(np.int64) for values in arrays], shape), shape
+
+    def crosstab(self, keys, weights):
+        cells, shape = self._cells(list(keys.values()))
+        size = int(np.prod(shape))
+        n = np.bincount(cells, minlength=size)
+        occupied = np.flatnonzero(n)
+        weight = np.bincount(cells, weights=weights, minlength=size)[occupied]
+        weight_sq = np.bincount(cells, weights=weights * weights, minlength=size)[occupied]
+        return _frame(dict(zip(keys, np.unravel_index(occupied, shape))), n=n[occupied], weight=weight, weight_sq=weight_sq)
+
+    def normalize(self, sums, within):
+        cells, _ = self._cells([sums[key].to_numpy() for key in within])
+        weight = sums["weight"].to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return weight / np.bincount(cells, weights=weight)[cells]
+
+
+class PandasBackend:
+    """``groupby`` aggregation, the reference the other backends are checked against."""
+
+    name = "pandas"
+
+    def crosstab(self, keys, weights):
+        rows = _frame(keys, weight=weights, weight_sq=weights * weights)
+        sums = rows.groupby(list(keys), sort=False).agg(
+            n=("weight", "size"), weight=("weight", "sum"), weight_sq=("weight_sq", "sum")
+        )
+        return sums.reset_index()
+
+    def normalize(self, sums, within):
+        return (sums["weight"] / sums.groupby(within)["weight"].transform("sum")).to_numpy()
+
+
+class ArrowBackend:
+    """Hash aggregation with ``pyarrow.Table.group_by``."""
+
+    name = "arrow"
+
+    def crosstab(self, keys, weights):
+        table = pa.table({**keys, "weight": weights, "weight_sq": weights * weights})
+        sums = table.group_by(list(keys)).aggregate([("weight", "count"), ("weight", "sum"), ("weight_sq", "sum")])
+        return pd.DataFrame({
+            **{name: sums.column(name).to_numpy() for name in keys},
+            "n": sums.column("weight_count").to_numpy(),
+            "weight": sums.column("weight_sum").to_numpy(),
+            "weight_sq": sums.column("weight_sq_sum").to_numpy(),
+        })
+
+    def normalize(self, sums, within):
+        table = pa.table({**{key: sums[key].to_numpy() for key in within}, "weight": sums["weight"].to_numpy()})
+        table = table.append_column("row", pa.array(np.arange(len(sums))))
+        totals = table.group_by(within).aggregate([("weight", "sum")])
+        joined = table.join(totals, within).sort_by("row")
+        weight = joined.column("weight").to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return weight / joined.column("weight_sum").to_numpy()
+
+
+class DuckDBBackend:
+    """SQL aggregation in an in-process DuckDB database."""
+
+    name = "duckdb"
+
+    def __init__(self):
+        try:
+            import duckdb
+        except ImportError as error:
+            raise BackendUnavailable("the duckdb backend needs `pip install duckdb`") from error
+        self._duckdb = duckdb
+
+    def _query(self, sql, frame):
+        connection = self._duckdb.connect()
+        try:
+            connection.register("frame", frame)
+            return connection.execute(sql).df()
+        finally:
+            connection.close()
+
+    def crosstab(self, keys, weights):
+        columns = ", ".join(f'"{name}"' for name in keys)
+        sql = f'SELECT {columns}, count(*) AS n, sum(weight) AS weight, sum(weight * weight) AS weight_sq FROM frame GROUP BY {columns}'
+        sums = self._query(sql, _frame(keys, weight=weights))
+        return sums.astype({name: np.asarray(values).dtype for name, values in keys.items()})
+
+    def normalize(self, sums, within):
+        partition = ", ".join(f'"{key}"' for key in within)
+        frame = sums[within + ["weight"]].assign(row=np.arange(len(sums)))
+        sql = f"SELECT weight / sum(weight) OVER (PARTITION BY {partition}) AS percent FROM frame ORDER BY row"
+        return self._query(sql, frame)["percent"].to_numpy()
+
+
+BACKENDS = {backend.name: backend for backend in [NumpyBackend, PandasBackend, ArrowBackend, DuckDBBackend]}
+
+
+def get_backend(name=None):
+    """The backend called ``name``, or the configured default."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown aggregation backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def main():
+    from .cube import CUBE_KEYS, build_cube
+    from .loader import load_records
+    from .schema import DASHBOARD_COLUMNS, RECORDS_PATH
+
+    parser = argparse.ArgumentParser(description="Check the aggregation backends against the pandas reference.")
+    parser.add_argument("--source", default=RECORDS_PATH, help="records parquet file to aggregate")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per backend")
+    args = parser.parse_args()
+
+    records = load_records(DASHBOARD_COLUMNS, args.source)
+    reference = build_cube(records, get_backend("pandas")).sort_values(CUBE_KEYS).reset_index(drop=True)
+    failed = False
+    for name in BACKENDS:
+        try:
+            backend = get_backend(name)
+        except BackendUnavailable as error:
+            print(f"{name:<8} skipped: {error}")
+            continue
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            cube = build_cube(records, backend)
+            timings.append(time.perf_counter() - start)
+        cube = cube.sort_values(CUBE_KEYS).reset_index(drop=True)
+        try:
+            pd.testing.assert_frame_equal(cube, reference, check_exact=False, rtol=1e-9)
+            result = "matches pandas"
+        except AssertionError as error:
+            failed = True
+            result = f"DIFFERS: {str(error).splitlines()[0]}"
+        print(f"{name:<8} {min(timings):>7.3f}s  {len(cube):>6} rows  {result}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
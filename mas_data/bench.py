@@ -0,0 +1,118 @@
+"""Compare app cold-start cost of the Parquet and Arrow IPC data builds.
+
+Usage::
+
+    python -m mas_data.build --ipc   # the benchmark needs both formats
+    python -m mas_data.bench [--repeat 5]
+
+Every run starts a fresh interpreter that loads the build the way the app
+does and reports:
+
+- ``first chart``: seconds to read the catalog and cube and render the Metro
+  Summary distribution chart, i.e. what a visitor waits for
+- ``records``: seconds to load the full records dataset on top of that
+- ``rss`` and ``peak rss``: resident memory after both steps
+
+Runs reuse the OS page cache, so these are warm-cache numbers. Only the fact
+table has an IPC copy, so ``first chart`` reads the Parquet cube in both
+formats and ``records`` is the step the IPC build can speed up.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from .build import IPC_ARTIFACTS, artifact_path, check_build, read_artifact
+from .schema import BUILD_PATH, YEAR_COLUMN
+
+FORMATS = ["parquet", "ipc"]
+
+
+def _rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def measure(format, root=BUILD_PATH):
+    """Load the build in ``format`` in this process and return its timings."""
+    start = time.perf_counter()
+    import altair as alt
+    import pandas as pd
+
+    from .cube import AggregateCube
+    from .dataset import RecordsDataset
+    from .star import denormalize, read_dimensions
+
+    prefer_ipc = format == "ipc"
+    catalog = pd.read_parquet(artifact_path("catalog", root))
+    cube = AggregateCube(read_artifact("cube", root, prefer_ipc))
+    first = catalog.iloc[-1]
+    summary = cube.distribution(first["question"], int(first[YEAR_COLUMN]))
+    alt.Chart(summary).mark_bar().encode(x="percent:Q", y="response:N").to_dict()
+    first_chart = time.perf_counter() - start
+
+    start = time.perf_counter()
+    facts = read_artifact("facts", root, prefer_ipc)
+    dataset = RecordsDataset(denormalize(facts, read_dimensions(root)))
+    records = time.perf_counter() - start
+    return {
+        "first_chart": first_chart,
+        "records": records,
+        "rows": len(dataset),
+        "rss_mb": _rss_mb(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(format, root=BUILD_PATH):
+    """Measure ``format`` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-m", "mas_data.bench", "--child", format, "--output", root],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold-start cost of the Parquet and Arrow IPC builds.")
+    parser.add_argument("--output", default=BUILD_PATH, help="build directory to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per format")
+    parser.add_argument("--child", choices=FORMATS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.output)))
+        return
+
+    reason = check_build(args.output)
+    if reason:
+        sys.exit(f"Stale build in {args.output}: {reason}. Run `python -m mas_data.build --ipc`.")
+    if not all(os.path.exists(os.path.join(args.output, name)) for name in IPC_ARTIFACTS.values()):
+        sys.exit(f"{args.output} has no Arrow IPC files. Run `python -m mas_data.build --ipc`.")
+
+    print(f"{'format':<8} {'first chart':>12} {'records':>9} {'rss':>9} {'peak rss':>9}")
+    for format in FORMATS:
+        runs = [run(format, args.output) for _ in range(args.repeat)]
+
+        def median(key):
+            return statistics.median(r[key] for r in runs)
+
+        print(
+            f"{format:<8} {median('first_chart'):>11.3f}s {median('records'):>8.3f}s "
+            f"{median('rss_mb'):>7.0f}MB {median('peak_rss_mb'):>7.0f}MB"
+        )
+    print(f"Medians of {args.repeat} runs per format with a warm page cache.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Packed bitmap indexes over the values of record columns."""
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """One packed bitmap per value of each indexed column, built once.
+
+    Bit ``i`` of the bitmap for ``(column, value)`` is set when row ``i``
+    holds ``value``. Filters combine bitmaps with bitwise OR within a column
+    and AND across columns, touching only the bytes of the requested row
+    range. Missing values are in no bitmap.
+    """
+
+    def __init__(self, frame, columns):
+        self._length = len(frame)
+        self._bitmaps = {}
+        for column in columns:
+            values = frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                labels, codes = values.cat.categories.tolist(), values.cat.codes.to_numpy()
+            else:
+                labels, codes = np.unique(values.to_numpy(), return_inverse=True)
+                labels = labels.tolist()
+            for code, label in enumerate(labels):
+                bitmap = np.packbits(codes == code)
+                bitmap.flags.writeable = False
+                self._bitmaps[(column, label)] = bitmap
+        self.columns = list(columns)
+
+    def __len__(self):
+        return self._length
+
+    def values(self, column):
+        """Indexed values of ``column``."""
+        return [value for indexed, value in self._bitmaps if indexed == column]
+
+    def mask(self, filters, start=0, stop=None):
+        """Boolean mask of rows ``start:stop`` matching every filter.
+
+        ``filters`` maps columns to a value or a list of accepted values.
+        """
+        stop = self._length if stop is None else stop
+        first, last = start // 8, -(-stop // 8)
+        combined = np.full(last - first, 0xFF, dtype=np.uint8)
+        for column, accepted in filters.items():
+            if column not in self.columns:
+                raise KeyError(f"{column!r} is not indexed")
+            if isinstance(accepted, (str, int, np.integer)):
+                accepted = [accepted]
+            either = np.zeros_like(combined)
+            for value in accepted:
+                bitmap = self._bitmaps.get((column, value))
+                if bitmap is not None:
+                    either |= bitmap[first:last]
+            combined &= either
+        offset = start - first * 8
+        return np.unpackbits(combined, count=offset + stop - start)[offset:].view(bool)
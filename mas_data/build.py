@@ -0,0 +1,416 @@
+"""Compile the records file into the artifacts the dashboard reads.
+
+Usage::
+
+    python -m mas_data.build                   # build Data/build from the records file
+    python -m mas_data.build --ipc             # also write an uncompressed Arrow IPC copy of the facts
+    python -m mas_data.build --append new.parquet  # add a new survey year to the build
+    python -m mas_data.build --check           # exit non-zero if Data/build is missing or stale
+
+The build writes, under ``Data/build``:
+
+- ``facts/`` and ``dim_*.parquet``: the dashboard columns as an integer fact
+  table plus dimension tables (see ``mas_data.star``)
+- ``cube/``: the weighted aggregate cube (see ``mas_data.cube``)
+- ``catalog.parquet``: question text and row counts per question and year
+- ``movers.parquet``: year-over-year changes ranked by size (see
+  ``mas_data.movers``)
+- ``facts_ipc/`` (with ``--ipc``): an uncompressed Arrow IPC copy of the
+  fact table, which loads the records without decoding Parquet
+- ``manifest.json``: content hashes, row counts, the suppression rule and
+  build timings
+
+The fact table and cube hold one directory per survey year. Neither depends
+on other years, so :func:`append_year` computes and writes only the new
+year's directories, the catalog, the movers (which compare the new year with
+the one before it) and, when the new year brings new labels, the dimension
+tables; earlier years' files are left as they are.
+
+A build is fresh when its manifest matches the content hash of the current
+records file, ``BUILD_VERSION`` and the suppression thresholds in effect
+(see ``mas_data.stats``), since the cube stores which groups are suppressed. The app reads fresh artifacts directly;
+otherwise it computes everything in memory, or refuses to start when the
+``MAS_REQUIRE_BUILD`` environment variable is set to ``1``.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .backends import BACKENDS, DEFAULT_BACKEND, BackendUnavailable, get_backend
+from .cube import build_cube
+from .loader import compact_table, read_years, write_years
+from .movers import rank_movers
+from .schema import BUILD_PATH, DASHBOARD_COLUMNS, RECORDS_PATH, YEAR_COLUMN
+from .stats import SUPPRESSION
+from .star import STAR_FILES, normalize, read_dimensions, write_dimensions
+
+# Bump whenever the layout of an artifact changes so older builds count as stale
+BUILD_VERSION = 11
+
+ARTIFACTS = {
+    **STAR_FILES,
+    "cube": "cube",
+    "catalog": "catalog.parquet",
+    "movers": "movers.parquet",
+}
+# Optional uncompressed Arrow IPC copies, keyed by the artifact they duplicate. Only the
+# facts gain measurably: decoding the Parquet cube takes about 10 ms of a half-second start.
+IPC_ARTIFACTS = {
+    "facts": "facts_ipc",
+}
+MANIFEST_FILE = "manifest.json"
+
+
+class StaleBuildError(RuntimeError):
+    """Raised when fresh build artifacts are required but not available."""
+
+
+class AppendError(ValueError):
+    """Raised when records do not fit the build they are appended to."""
+
+
+def artifact_path(name, root=BUILD_PATH):
+    return os.path.join(root, ARTIFACTS[name])
+
+
+def read_artifact(name, root=BUILD_PATH, prefer_ipc=True):
+    """Read the fact table or cube, from its Arrow IPC copy when there is one."""
+    if prefer_ipc and name in IPC_ARTIFACTS:
+        path = os.path.join(root, IPC_ARTIFACTS[name])
+        if os.path.exists(path):
+            return read_years(path, format="ipc")
+    return read_years(artifact_path(name, root))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_sha256(path):
+    """Content hash of a file, or of every file under a directory."""
+    if not os.path.isdir(path):
+        return file_sha256(path)
+    digest = hashlib.sha256()
+    for folder, _, files in sorted(os.walk(path)):
+        for name in sorted(files):
+            full_path = os.path.join(folder, name)
+            digest.update(os.path.relpath(full_path, path).encode())
+            digest.update(file_sha256(full_path).encode())
+    return digest.hexdigest()
+
+
+def question_catalog(frame):
+    """Question text and row counts for every question and survey year."""
+    catalog = (
+        frame.groupby(["question", "q_short", "q_verb", YEAR_COLUMN], observed=True)
+        .size()
+        .reset_index(name="rows")
+    )
+    for column in ["question", "q_short", "q_verb"]:
+        catalog[column] = catalog[column].astype(str)
+    return catalog.sort_values(["question", YEAR_COLUMN]).reset_index(drop=True)
+
+
+def _timer(timings):
+    def timed(step, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[step] = round(time.perf_counter() - start, 3)
+        return result
+    return timed
+
+
+def _write_artifacts(records, facts, dimensions, root, ipc, backend, timed):
+    """Write the artifacts derived from ``records`` and return ``(cube, catalog)``.
+
+    Year-partitioned artifacts only get the years present in ``records``.
+    """
+    cube = timed("cube", build_cube, records, get_backend(backend))
+    catalog = timed("catalog", question_catalog, records)
+    timed("write_facts", write_years, facts, artifact_path("facts", root))
+    timed("write_cube", write_years, cube, artifact_path("cube", root))
+    if ipc:
+        frames = {"facts": facts}
+        for name, directory in IPC_ARTIFACTS.items():
+            timed(f"write_{name}_ipc", write_years, frames[name], os.path.join(root, directory), "ipc")
+    return cube, catalog
+
+
+def _artifact_entries(root, row_counts, ipc):
+    names = dict(ARTIFACTS)
+    if ipc:
+        names.update({f"{name}_ipc": directory for name, directory in IPC_ARTIFACTS.items()})
+    return {
+        name: {
+            "path": file_name,
+            "rows": row_counts[name.removesuffix("_ipc")],
+            "sha256": artifact_sha256(os.path.join(root, file_name)),
+        }
+        for name, file_name in names.items()
+    }
+
+
+def _write_manifest(manifest, root):
+    # Written beside the target and moved into place, so the app never reads half a manifest
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _replace_directory(staging, target):
+    """Move ``staging`` to ``target``, so readers never see a half-written build."""
+    previous = None
+    if os.path.exists(target):
+        previous = target + ".previous"
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(target, previous)
+    os.replace(staging, target)
+    if previous:
+        shutil.rmtree(previous)
+
+
+def build(source=RECORDS_PATH, output=BUILD_PATH, ipc=False, backend=None):
+    """Build every artifact from ``source`` into ``output`` and return the manifest.
+
+    With ``ipc`` the fact table is also written as Arrow IPC files.
+    ``backend`` names the aggregation backend for the cube (see
+    ``mas_data.backends``).
+    """
+    timings = {}
+    timed = _timer(timings)
+    parent = os.path.dirname(os.path.abspath(output))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".build-", dir=parent)
+    try:
+        table = timed("read", pq.read_table, source)
+        records = timed("compact", lambda: compact_table(table.select(DASHBOARD_COLUMNS)).to_pandas())
+        facts, dimensions = timed("normalize", normalize, records)
+        timed("write_dimensions", write_dimensions, dimensions, staging)
+        cube, catalog = _write_artifacts(records, facts, dimensions, staging, ipc, backend, timed)
+        timed("write_catalog", catalog.to_parquet, artifact_path("catalog", staging))
+        movers = timed("movers", rank_movers, cube)
+        timed("write_movers", movers.to_parquet, artifact_path("movers", staging))
+
+        row_counts = {name: len(frame) for name, frame in dimensions.items()}
+        row_counts.update(facts=len(facts), cube=len(cube), catalog=len(catalog), movers=len(movers))
+        manifest = {
+            "build_version": BUILD_VERSION,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "source": {
+                "path": source,
+                "sha256": file_sha256(source),
+                "bytes": os.path.getsize(source),
+                "rows": table.num_rows,
+            },
+            "suppression": SUPPRESSION._asdict(),
+            "artifacts": _artifact_entries(staging, row_counts, ipc),
+            "timings_seconds": timings,
+        }
+        _write_manifest(manifest, staging)
+        _replace_directory(staging, output)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+
+def _type_family(data_type):
+    """Kind of values an Arrow type holds; :func:`compact_table` casts every type of a kind alike."""
+    if pa.types.is_dictionary(data_type):
+        data_type = data_type.value_type
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        return "text"
+    if pa.types.is_integer(data_type):
+        return "integer"
+    if pa.types.is_floating(data_type):
+        return "floating point"
+    return str(data_type)
+
+
+def _check_columns(table, source):
+    expected = pq.read_schema(source)
+    problems = [
+        f"{column}: expected {_type_family(expected.field(column).type)}, got "
+        f"{_type_family(table.schema.field(column).type) if column in table.column_names else 'no column'}"
+        for column in DASHBOARD_COLUMNS
+        if column not in table.column_names
+        or _type_family(table.schema.field(column).type) != _type_family(expected.field(column).type)
+    ]
+    if problems:
+        raise AppendError("Columns do not match the records file: " + "; ".join(problems))
+
+
+def _check_records(records, catalog, dimensions, extended, allow_new_labels):
+    """Raise :class:`AppendError` unless ``records`` can be added to the build.
+
+    Returns the new survey years and any labels added to the dimensions.
+    """
+    years = sorted(records[YEAR_COLUMN].unique().tolist())
+    existing = sorted(set(years) & set(catalog[YEAR_COLUMN].tolist()))
+    if existing:
+        raise AppendError(f"Survey years already in the build: {existing}. Run a full build to replace them.")
+
+    known = dimensions["questions"].set_index("question")[["q_short", "q_verb"]]
+    text = records.groupby("question", observed=True)[["q_short", "q_verb"]].first()
+    text.index = text.index.astype(str)
+    text = text.astype(str).loc[text.index.intersection(known.index)]
+    changed = text.index[(text != known.loc[text.index]).any(axis=1)].tolist()
+    if changed:
+        raise AppendError(f"Question text differs from the build for: {changed}")
+
+    new_labels = {}
+    for name, label in [("questions", "question"), ("responses", "response")]:
+        added = extended[name][label].iloc[len(dimensions[name]):].tolist()
+        if added:
+            new_labels[label] = added
+    values = extended["values"].merge(dimensions["values"], how="left", indicator=True)
+    for column, added in values[values["_merge"] == "left_only"].groupby("column")["value"]:
+        new_labels[column] = added.tolist()
+    if new_labels and not allow_new_labels:
+        listed = "; ".join(f"{column}: {labels}" for column, labels in new_labels.items())
+        raise AppendError(f"Labels not in the build (pass --allow-new-labels if they are expected): {listed}")
+    return years, new_labels
+
+
+def append_year(records_path, root=BUILD_PATH, source=RECORDS_PATH, allow_new_labels=False, backend=None):
+    """Add the new survey year in ``records_path`` to the fresh build under ``root``.
+
+    The records are checked against the column types of ``source``, the
+    years and question text already in the build, and the dimension labels
+    (new labels are refused unless ``allow_new_labels``). Only the new year's
+    directories, the catalog, the movers and any extended dimension tables
+    are written.
+    Returns the updated manifest.
+    """
+    reason = check_build(root, source)
+    if reason is not None:
+        raise StaleBuildError(f"{root}: {reason}. Run `python -m mas_data.build` first.")
+    manifest = read_manifest(root)
+    timings = {}
+    timed = _timer(timings)
+
+    table = timed("read", pq.read_table, records_path)
+    _check_columns(table, source)
+    records = timed("compact", lambda: compact_table(table.select(DASHBOARD_COLUMNS)).to_pandas())
+    catalog = pd.read_parquet(artifact_path("catalog", root))
+    dimensions = read_dimensions(root)
+    facts, extended = timed("normalize", normalize, records, dimensions)
+    years, new_labels = _check_records(records, catalog, dimensions, extended, allow_new_labels)
+
+    ipc = "facts_ipc" in manifest["artifacts"]
+    if new_labels:
+        timed("write_dimensions", write_dimensions, extended, root)
+    cube, new_catalog = _write_artifacts(records, facts, extended, root, ipc, backend, timed)
+    catalog = pd.concat([catalog, new_catalog], ignore_index=True).sort_values(["question", YEAR_COLUMN])
+    timed("write_catalog", catalog.reset_index(drop=True).to_parquet, artifact_path("catalog", root))
+    movers = timed("movers", rank_movers, read_artifact("cube", root))
+    timed("write_movers", movers.to_parquet, artifact_path("movers", root))
+
+    row_counts = {name: len(frame) for name, frame in extended.items()}
+    previous = manifest["artifacts"]
+    row_counts.update(
+        facts=previous["facts"]["rows"] + len(facts),
+        cube=previous["cube"]["rows"] + len(cube),
+        catalog=len(catalog),
+        movers=len(movers),
+    )
+    manifest["artifacts"] = _artifact_entries(root, row_counts, ipc)
+    manifest.setdefault("appended", []).append({
+        "path": records_path,
+        "sha256": file_sha256(records_path),
+        "rows": table.num_rows,
+        "years": years,
+        "new_labels": new_labels,
+        "appended_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "timings_seconds": timings,
+    })
+    _write_manifest(manifest, root)
+    return manifest
+
+
+def read_manifest(root=BUILD_PATH):
+    """The manifest of the build under ``root``, or None if there is none."""
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def check_build(root=BUILD_PATH, source=RECORDS_PATH, verify_artifacts=False):
+    """Return None if ``root`` holds a fresh build of ``source``, else why it is stale.
+
+    With ``verify_artifacts`` every artifact is also re-hashed against the
+    manifest, which catches partial copies, hand edits and interrupted appends.
+    """
+    manifest = read_manifest(root)
+    if manifest is None:
+        return "no build found"
+    if manifest.get("build_version") != BUILD_VERSION:
+        return "built by a different version of mas_data.build"
+    if manifest.get("suppression") != SUPPRESSION._asdict():
+        return "built with different suppression thresholds"
+    if manifest["source"]["sha256"] != file_sha256(source):
+        return f"{source} changed since the last build"
+    if verify_artifacts:
+        for name, artifact in manifest["artifacts"].items():
+            path = os.path.join(root, artifact["path"])
+            if not os.path.exists(path) or artifact_sha256(path) != artifact["sha256"]:
+                return f"{name} artifact does not match the manifest"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the derived data artifacts used by the dashboard.")
+    parser.add_argument("--source", default=RECORDS_PATH, help="records parquet file to build from")
+    parser.add_argument("--output", default=BUILD_PATH, help="directory to write the artifacts to")
+    parser.add_argument("--ipc", action="store_true", help="also write an uncompressed Arrow IPC copy of the facts")
+    parser.add_argument("--append", metavar="RECORDS", help="add a new survey year's records to the existing build")
+    parser.add_argument("--allow-new-labels", action="store_true", help="with --append, accept questions, responses or demographic values the build has not seen")
+    parser.add_argument("--backend", choices=BACKENDS, help=f"aggregation backend for the cube (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--check", action="store_true", help="only verify that the existing build is fresh")
+    args = parser.parse_args()
+
+    if args.check:
+        reason = check_build(args.output, args.source, verify_artifacts=True)
+        if reason:
+            sys.exit(f"Stale build in {args.output}: {reason}")
+        print(f"{args.output} is up to date with {args.source}")
+        return
+
+    if args.append:
+        try:
+            manifest = append_year(args.append, args.output, args.source, args.allow_new_labels, args.backend)
+        except (AppendError, BackendUnavailable, StaleBuildError) as error:
+            sys.exit(f"Cannot append {args.append}: {error}")
+        appended = manifest["appended"][-1]
+        print(f"Appended {appended['rows']} rows for {appended['years']} in {sum(appended['timings_seconds'].values()):.1f}s")
+        return
+
+    try:
+        manifest = build(args.source, args.output, ipc=args.ipc, backend=args.backend)
+    except BackendUnavailable as error:
+        sys.exit(f"Cannot build: {error}")
+    for name, artifact in manifest["artifacts"].items():
+        print(f"{name:>10}: {artifact['rows']:>8} rows  {artifact['path']}")
+    print(f"Built {args.output} in {sum(manifest['timings_seconds'].values()):.1f}s")
+
+
+if __name__ == "__main__":
+    main()
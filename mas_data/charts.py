@@ -0,0 +1,16 @@
+"""Altair layers shared by the pages' charts."""
+
+import altair as alt
+
+
+def trend_layers(base, **line):
+    """``base`` drawn as lines with a diamond on every significant change.
+
+    ``base`` is an encoded chart of a trend tested by
+    ``mas_data.significance.year_over_year_tests``; ``line`` styles the line
+    mark.
+    """
+    return alt.layer(
+        base.mark_line(point=True, **line),
+        base.mark_point(shape="diamond", size=150, filled=True, opacity=1).transform_filter("datum.significant"),
+    )
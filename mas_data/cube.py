@@ -0,0 +1,304 @@
+"""Precomputed weighted response sums for every question, year and demographic group.
+
+The cube holds one row per question, survey year, demographic, demographic
+group and response with the weighted sum (``weight``), the sum of squared
+weights (``weight_sq``), the unweighted count (``n``) and the share of the
+group's weight (``percent``). Each row also carries the group's Kish
+effective sample size (``n_eff``) and the 95% margin of error of its
+percentage (``moe``, see ``mas_data.stats``), the group's unweighted number
+of answers (``group_n``) and whether the group is too small to report
+(``suppressed``, under the rule in ``mas_data.stats``). Whole-region
+results are stored under the ``Metro`` demographic and City of Atlanta
+residents, weighted by ``atlwt``, as their own ``Jurisdiction`` group. The
+pages render from lookups into the cube instead of grouping raw records,
+with between-group significance tests memoized beside the crosstabs, and
+:func:`build_cube` computes every slice in one crosstab over integer codes.
+The cube is written by the data build (``python -m mas_data.build``), one
+directory per survey year.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .backends import get_backend
+from .memo import MEMO_ENTRIES, MEMO_TTL, LRUMemo
+from .significance import chi_square_test, pairwise_tests, year_over_year_tests
+from .stats import effective_n, margin_of_error, suppressed
+from .schema import (
+    ATLANTA_DEMOGRAPHIC,
+    ATLANTA_GROUP,
+    DEMO_COL_MAP,
+    TOTAL_DEMOGRAPHIC,
+    TOTAL_GROUP,
+    YEAR_COLUMN,
+)
+
+CUBE_KEYS = ["question", YEAR_COLUMN, "demographic", "group", "response"]
+CUBE_COLUMNS = CUBE_KEYS + ["weight", "weight_sq", "n", "percent", "n_eff", "moe", "group_n", "suppressed"]
+
+# Measures returned by the lookups, after their key columns
+LOOKUP_COLUMNS = ["weight", "n", "percent", "n_eff", "moe", "group_n", "suppressed"]
+# Crosstab columns the significance tests read: the lookups' plus each cell's squared weight sum
+TESTED_COLUMNS = ["group", "response"] + LOOKUP_COLUMNS + ["weight_sq"]
+
+# Cells of one group's answers to one question in one year
+GROUP_CELL = ["question", YEAR_COLUMN, "group"]
+
+
+def grouping_sets(frame):
+    """Every slice of the cube: ``(demographic, group labels, group codes, weights)``.
+
+    Group codes index into the labels, with -1 for rows outside the slice.
+    The whole region and each demographic use ``countywt``; the City of
+    Atlanta slice holds only Atlanta residents and uses ``atlwt``.
+    """
+    countywt = frame["countywt"].to_numpy(dtype="float64")
+    everyone = np.zeros(len(frame), dtype=np.int16)
+    sets = [(TOTAL_DEMOGRAPHIC, [TOTAL_GROUP], everyone, countywt)]
+    for demographic, column in DEMO_COL_MAP.items():
+        sets.append((demographic, frame[column].cat.categories.astype(str).tolist(), frame[column].cat.codes.to_numpy(), countywt))
+    resident = frame["atlanta resident"]
+    yes = resident.cat.categories.get_indexer(["Yes"])[0]
+    atlanta = np.where(resident.cat.codes.to_numpy() == yes, everyone, -1) if yes >= 0 else everyone - 1
+    sets.append((ATLANTA_DEMOGRAPHIC, [ATLANTA_GROUP], atlanta, frame["atlwt"].to_numpy(dtype="float64")))
+    return sets
+
+
+def build_cube(frame, backend=None, rule=None):
+    """Aggregate records into the cube layout described in the module docstring.
+
+    Question, year, group and response become integer codes, with groups
+    numbered across every grouping set. Each set adds its rows to one
+    stacked set of codes that ``backend`` (see ``mas_data.backends``) counts
+    and weight-sums in a single crosstab, then normalizes within question,
+    year and group. The same group totals give every group's effective
+    sample size, every percentage's margin of error and whether the group is
+    suppressed under ``rule`` (a ``mas_data.stats.SuppressionRule``).
+    """
+    backend = backend or get_backend()
+    sets = grouping_sets(frame)
+    years = frame[YEAR_COLUMN].to_numpy()
+    first = years.min(initial=0)
+    year_values = np.flatnonzero(np.bincount(years - first)).astype(years.dtype) + first
+    demographics = np.array([demographic for demographic, groups, _, _ in sets for _ in groups], dtype=object)
+    labels = np.array([group for _, groups, _, _ in sets for group in groups], dtype=object)
+
+    row_keys = {
+        "question": frame["question"].cat.codes.to_numpy(),
+        YEAR_COLUMN: np.searchsorted(year_values, years),
+        "response": frame["response"].cat.codes.to_numpy(),
+    }
+    keys = {name: [] for name in ["question", YEAR_COLUMN, "group", "response"]}
+    weights = []
+    offset = 0
+    for _, groups, codes, set_weights in sets:
+        rows = codes >= 0
+        for name, values in row_keys.items():
+            keys[name].append(values[rows])
+        keys["group"].append(codes[rows].astype(np.int32) + offset)
+        weights.append(set_weights[rows])
+        offset += len(groups)
+    keys = {name: np.concatenate(values) for name, values in keys.items()}
+    weights = np.concatenate(weights)
+    # Missing weights count towards n but not the weight sums, as in a pandas sum
+    weights[np.isnan(weights)] = 0
+
+    sums = backend.crosstab(keys, weights)
+    percent = backend.normalize(sums, GROUP_CELL)
+    codes = [sums[key].to_numpy().astype(np.int64) for key in GROUP_CELL]
+    cells = np.ravel_multi_index(codes, [int(values.max(initial=-1)) + 1 for values in codes])
+    n_eff = effective_n(
+        np.bincount(cells, weights=sums["weight"].to_numpy())[cells],
+        np.bincount(cells, weights=sums["weight_sq"].to_numpy())[cells],
+    )
+    group_n = np.bincount(cells, weights=sums["n"].to_numpy())[cells].astype(np.int64)
+    group = sums["group"].to_numpy()
+    return pd.DataFrame({
+        "question": frame["question"].cat.categories.astype(str)[sums["question"].to_numpy()],
+        YEAR_COLUMN: year_values[sums[YEAR_COLUMN].to_numpy()],
+        "demographic": demographics[group],
+        "group": labels[group],
+        "response": frame["response"].cat.categories.astype(str)[sums["response"].to_numpy()],
+        "weight": sums["weight"].to_numpy(),
+        "weight_sq": sums["weight_sq"].to_numpy(),
+        "n": sums["n"].to_numpy(dtype=np.int64),
+        "percent": percent,
+        "n_eff": n_eff,
+        "moe": margin_of_error(percent, n_eff),
+        "group_n": group_n,
+        "suppressed": suppressed(group_n, n_eff, rule),
+    })[CUBE_COLUMNS]
+
+
+class AggregateCube:
+    """Lookups into a cube frame, indexed by question and demographic.
+
+    Row ranges of every question, demographic and group are indexed when the
+    cube is loaded, so trends of any group, Atlanta included, are slices.
+    Lookup results are memoized in ``memo`` (an :class:`LRUMemo`), so a view
+    that any session has already shown costs a dictionary lookup. Callers
+    get shallow copies and may add or replace columns freely.
+    """
+
+    def __init__(self, frame, memo=None):
+        self.memo = memo if memo is not None else LRUMemo(MEMO_ENTRIES, MEMO_TTL)
+        self.frame = frame.sort_values(["question", "demographic", "group", YEAR_COLUMN, "response"]).reset_index(drop=True)
+        self._index = {
+            key: (positions.min(), positions.max() + 1)
+            for key, positions in self.frame.groupby(["question", "demographic"], sort=False).indices.items()
+        }
+        # Every group's trend is a contiguous run of rows, so trend lookups are slices
+        self._groups = {
+            key: (positions.min(), positions.max() + 1)
+            for key, positions in self.frame.groupby(["question", "demographic", "group"], sort=False).indices.items()
+        }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _memoized(self, key, compute):
+        return self.memo.get(key, compute).copy(deep=False)
+
+    def _rows(self, question, demographic):
+        start, stop = self._index.get((question, demographic), (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def years(self, question):
+        """Survey years in which ``question`` was asked."""
+        return list(self.memo.get(
+            ("years", question),
+            lambda: sorted(self._rows(question, TOTAL_DEMOGRAPHIC)[YEAR_COLUMN].unique().tolist()),
+        ))
+
+    def groups(self, question, demographic):
+        """Groups of ``demographic`` with any answers to ``question``."""
+        return list(self.memo.get(
+            ("groups", question, demographic),
+            lambda: self._rows(question, demographic)["group"].unique().tolist(),
+        ))
+
+    def distribution(self, question, year):
+        """Whole-region response distribution: response, weight, n, percent, n_eff, moe, group_n, suppressed."""
+        return self._memoized(
+            ("distribution", question, year),
+            lambda: self.crosstab(question, year, TOTAL_DEMOGRAPHIC).drop(columns="group"),
+        )
+
+    def crosstab(self, question, year, demographic):
+        """Responses by group of ``demographic``: group, response, weight, n, percent, n_eff, moe, group_n, suppressed.
+
+        ``year`` may also be a tuple of survey years, which are pooled (see
+        :meth:`pooled`).
+        """
+        if isinstance(year, tuple):
+            return self.pooled(question, year, demographic)
+
+        def compute():
+            rows = self._rows(question, demographic)
+            rows = rows[rows[YEAR_COLUMN] == year]
+            return rows[["group", "response"] + LOOKUP_COLUMNS].reset_index(drop=True)
+        return self._memoized(("crosstab", question, year, demographic), compute)
+
+    def pooled(self, question, years, demographic):
+        """Responses by group of ``demographic`` pooled over several survey ``years``.
+
+        Each year's weights are rescaled to sum to the year's number of
+        respondents to ``question`` (the City of Atlanta's ``atlwt`` to its
+        own respondents), so every year counts in proportion to its sample
+        rather than its weight total. Percentages, effective sample sizes and
+        margins of error are then recomputed from the rescaled sums and
+        squared sums in the cube, without touching the records. A response
+        offered in only some of the years is a share of every year's
+        answers. Same columns as :meth:`crosstab`.
+        """
+        return self._memoized(
+            ("pooled", question, tuple(years), demographic),
+            lambda: self._pooled_cells(question, tuple(years), demographic)[["group", "response"] + LOOKUP_COLUMNS],
+        )
+
+    def _pooled_cells(self, question, years, demographic):
+        def compute():
+            rows = self._rows(question, demographic)
+            rows = rows[rows[YEAR_COLUMN].isin(years)]
+            totals = self._rows(question, TOTAL_DEMOGRAPHIC).groupby(YEAR_COLUMN)[["n", "weight"]].sum()
+            scale = rows[YEAR_COLUMN].map(totals["n"] / totals["weight"])
+            if demographic == ATLANTA_DEMOGRAPHIC:
+                atlanta = rows["group"] == ATLANTA_GROUP
+                atlanta_totals = rows[atlanta].groupby(YEAR_COLUMN)[["n", "weight"]].sum()
+                scale[atlanta] = rows.loc[atlanta, YEAR_COLUMN].map(atlanta_totals["n"] / atlanta_totals["weight"])
+            sums = rows.assign(weight=rows["weight"] * scale, weight_sq=rows["weight_sq"] * scale ** 2).groupby(
+                ["group", "response"], sort=False
+            )[["weight", "weight_sq", "n"]].sum().reset_index()
+            group_sums = sums.groupby("group", sort=False)[["weight", "weight_sq", "n"]].transform("sum")
+            with np.errstate(invalid="ignore", divide="ignore"):
+                percent = (sums["weight"] / group_sums["weight"]).to_numpy()
+            n_eff = effective_n(group_sums["weight"], group_sums["weight_sq"])
+            group_n = group_sums["n"].to_numpy(dtype=np.int64)
+            return sums.assign(
+                n=sums["n"].astype(np.int64),
+                percent=percent,
+                n_eff=n_eff,
+                moe=margin_of_error(percent, n_eff),
+                group_n=group_n,
+                suppressed=suppressed(group_n, n_eff),
+            )[TESTED_COLUMNS]
+        return self._memoized(("pooled_cells", question, years, demographic), compute)
+
+    def _tested(self, question, year, demographic, exclude_groups, exclude_responses):
+        """The crosstab cells of the tested groups and responses, in ``TESTED_COLUMNS``."""
+        if isinstance(year, tuple):
+            cells = self._pooled_cells(question, year, demographic)
+        else:
+            rows = self._rows(question, demographic)
+            cells = rows.loc[rows[YEAR_COLUMN] == year, TESTED_COLUMNS]
+        return cells[~cells["group"].isin(exclude_groups) & ~cells["response"].isin(exclude_responses)]
+
+    def chi_square(self, question, year, demographic, exclude_groups=(), exclude_responses=()):
+        """Whether responses differ across the groups of ``demographic``: a ``ChiSquareTest``.
+
+        ``year`` may be a tuple of years to pool, as in :meth:`crosstab`.
+        Groups in ``exclude_groups`` and responses in ``exclude_responses``
+        are left out of the test, so it covers what a chart shows.
+        """
+        exclude_groups, exclude_responses = tuple(sorted(exclude_groups)), tuple(sorted(exclude_responses))
+        return self.memo.get(
+            ("chi_square", question, year, demographic, exclude_groups, exclude_responses),
+            lambda: chi_square_test(
+                self._tested(question, year, demographic, exclude_groups, exclude_responses), demographic
+            ),
+        )
+
+    def pairwise(self, question, year, demographic, exclude_groups=(), exclude_responses=()):
+        """Every pair of groups compared on every response (see ``mas_data.significance``).
+
+        Takes the same exclusions as :meth:`chi_square`; excluded groups do
+        not count towards the Holm adjustment.
+        """
+        exclude_groups, exclude_responses = tuple(sorted(exclude_groups)), tuple(sorted(exclude_responses))
+        return self._memoized(
+            ("pairwise", question, year, demographic, exclude_groups, exclude_responses),
+            lambda: pairwise_tests(
+                self._tested(question, year, demographic, exclude_groups, exclude_responses), demographic
+            ),
+        )
+
+    def trend(self, question, demographic=TOTAL_DEMOGRAPHIC, group=TOTAL_GROUP):
+        """One group's responses in every year: survey year, response, weight, n, percent, n_eff, moe, group_n, suppressed.
+
+        Each row also carries its change since the previous year and whether
+        the change is significant (see ``mas_data.significance``).
+        """
+        def compute():
+            start, stop = self._groups.get((question, demographic, group), (0, 0))
+            return year_over_year_tests(self.frame.iloc[start:stop][[YEAR_COLUMN, "response"] + LOOKUP_COLUMNS])
+        return self._memoized(("trend", question, demographic, group), compute)
+
+    def trends(self, question, demographic=TOTAL_DEMOGRAPHIC):
+        """Every group's trend at once: group, survey year, response, weight, n, percent, n_eff, moe, group_n, suppressed.
+
+        With the same year-over-year change columns as :meth:`trend`.
+        """
+        return self._memoized(
+            ("trends", question, demographic),
+            lambda: year_over_year_tests(self._rows(question, demographic)[["group", YEAR_COLUMN, "response"] + LOOKUP_COLUMNS]),
+        )
@@ -0,0 +1,53 @@
+"""Immutable records dataset that every session can share without copying."""
+
+import pandas as pd
+
+from .loader import load_records
+from .schema import RECORDS_PATH
+
+
+def _read_only(values):
+    values.flags.writeable = False
+    return values
+
+
+def freeze_frame(frame):
+    """Rebuild ``frame`` on read-only NumPy buffers.
+
+    Categoricals keep their dtype and only their codes are frozen, so any
+    attempt to write into the shared buffers fails (or copies, under pandas
+    copy-on-write) instead of leaking into other sessions.
+    """
+    columns = {}
+    for name in frame.columns:
+        column = frame[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = _read_only(column.cat.codes.to_numpy())
+            columns[name] = pd.Categorical.from_codes(codes, dtype=column.dtype)
+        else:
+            columns[name] = _read_only(column.to_numpy())
+    return pd.DataFrame(columns, copy=False)
+
+
+class RecordsDataset:
+    """The records on read-only buffers, built once per process.
+
+    Rows keep the order they were loaded in. Every reader (the in-memory
+    cube and catalog, the respondent matrix) aggregates over the whole
+    frame, so nothing depends on the order.
+    """
+
+    def __init__(self, frame):
+        self.frame = freeze_frame(frame)
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def columns(self):
+        return self.frame.columns
+
+
+def load_dataset(columns=None, path=RECORDS_PATH):
+    """Load the records file into a :class:`RecordsDataset`."""
+    return RecordsDataset(load_records(columns, path))
@@ -0,0 +1,162 @@
+"""Stream raw respondent-level survey exports into the long records format.
+
+Usage::
+
+    python -m mas_data.ingest export_2016_2024.csv export_2025.csv -o Data/records.parquet
+    python -m mas_data.ingest export_2026.csv --year 2026 -o Data/new_year.parquet
+
+A raw export is a CSV with one row per respondent: the respondent columns of
+the records file (``survID``, ``survey year``, the weights and the
+demographics) plus one column per question, named by its question code and
+holding the respondent's answer. The records file has one row per respondent
+and answered question instead, with the question text looked up by code.
+
+The exports are read in blocks of ``--block-mb`` megabytes. Each block is
+reshaped and appended to the output as its own row group, so memory use
+depends on the block size and the number of questions, not on the size of
+the export. Unanswered questions (empty cells) produce no row.
+
+The output has the records file's column names and types and can replace it
+or be added to the data build with ``python -m mas_data.build --append``.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as csv
+import pyarrow.parquet as pq
+
+from .schema import QUESTION_COLUMNS, RECORDS_PATH, RESPONDENT_KEY, WEIGHT_COLUMNS, YEAR_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# Columns every export must provide, besides the question columns
+REQUIRED_COLUMNS = RESPONDENT_KEY + WEIGHT_COLUMNS
+
+BLOCK_MB = 16
+
+
+class IngestError(ValueError):
+    """Raised when an export does not have the columns the records need."""
+
+
+def question_text(path=RECORDS_PATH):
+    """Question code -> (q_short, q_verb), taken from a records file or a CSV with those columns."""
+    columns = ["question", "q_short", "q_verb"]
+    if path.endswith(".csv"):
+        table = csv.read_csv(path, convert_options=csv.ConvertOptions(include_columns=columns))
+    else:
+        table = pq.read_table(path, columns=columns)
+    text = table.group_by("question").aggregate([("q_short", "first"), ("q_verb", "first")]).to_pylist()
+    return {row["question"]: (row["q_short_first"], row["q_verb_first"]) for row in text}
+
+
+def _header(path):
+    return csv.open_csv(path, read_options=csv.ReadOptions(block_size=1 << 20)).schema.names
+
+
+def _long_block(block, respondent_columns, questions, schema):
+    """Reshape one block of wide respondents into long records cast to ``schema``."""
+    respondents = block.select(respondent_columns)
+    parts = []
+    for code, (short, verb) in questions.items():
+        if code not in block.column_names:
+            continue
+        response = block.column(code)
+        answered = pc.is_valid(response)
+        rows = pc.sum(answered).as_py() or 0
+        if rows == 0:
+            continue
+        part = respondents.filter(answered)
+        for name, values in [
+            ("question", pa.repeat(code, rows)),
+            ("q_short", pa.repeat(short, rows)),
+            ("q_verb", pa.repeat(verb, rows)),
+            ("response", response.filter(answered)),
+        ]:
+            part = part.append_column(name, values)
+        parts.append(part)
+    if not parts:
+        return schema.empty_table()
+    return pa.concat_tables(parts).select(schema.names).cast(schema)
+
+
+def ingest(exports, output, questions=None, year=None, block_mb=BLOCK_MB, records_schema=None):
+    """Convert the raw ``exports`` into one long records parquet file at ``output``.
+
+    ``questions`` maps question codes to ``(q_short, q_verb)`` and defaults to
+    the questions of the records file. ``year`` fills the survey year for
+    exports without that column. Returns the number of rows written.
+    """
+    questions = questions if questions is not None else question_text()
+    records_schema = records_schema or pq.read_schema(RECORDS_PATH).remove_metadata()
+
+    headers = {path: _header(path) for path in exports}
+    provided = set().union(*headers.values()) | ({YEAR_COLUMN} if year is not None else set())
+    respondent_columns = [
+        field.name for field in records_schema
+        if field.name in provided and field.name not in QUESTION_COLUMNS
+    ]
+    schema = pa.schema([field for field in records_schema if field.name in respondent_columns or field.name in QUESTION_COLUMNS])
+    for path, header in headers.items():
+        missing = [column for column in REQUIRED_COLUMNS if column not in header and not (column == YEAR_COLUMN and year is not None)]
+        if missing:
+            raise IngestError(f"{path} lacks columns: {missing}")
+        if not any(code in header for code in questions):
+            raise IngestError(f"{path} has no known question columns")
+
+    written = 0
+    staging = output + ".tmp"
+    try:
+        with pq.ParquetWriter(staging, schema) as writer:
+            for path in exports:
+                header = headers[path]
+                # Respondent columns are parsed with their records-file types,
+                # answers as text; empty cells are read as missing
+                column_types = {column: schema.field(column).type for column in respondent_columns if column in header}
+                column_types.update({code: pa.string() for code in questions if code in header})
+                convert = csv.ConvertOptions(
+                    column_types=column_types,
+                    include_columns=list(column_types),
+                    strings_can_be_null=True,
+                )
+                reader = csv.open_csv(path, read_options=csv.ReadOptions(block_size=int(block_mb * (1 << 20))), convert_options=convert)
+                for batch in reader:
+                    block = pa.Table.from_batches([batch])
+                    if YEAR_COLUMN not in header:
+                        block = block.append_column(YEAR_COLUMN, pa.repeat(pa.scalar(year, schema.field(YEAR_COLUMN).type), len(block)))
+                    long = _long_block(block, respondent_columns, questions, schema)
+                    writer.write_table(long)
+                    written += len(long)
+                logger.info("Ingested %s: %d records so far", path, written)
+        os.replace(staging, output)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert raw respondent-level CSV exports into the long records format.")
+    parser.add_argument("exports", nargs="+", help="raw CSV exports, one row per respondent")
+    parser.add_argument("-o", "--output", required=True, help="records parquet file to write")
+    parser.add_argument("--questions", default=RECORDS_PATH, help="records file or CSV with question, q_short and q_verb columns")
+    parser.add_argument("--year", type=int, help="survey year for exports without a survey year column")
+    parser.add_argument("--block-mb", type=float, default=BLOCK_MB, help="megabytes of CSV read per block")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        rows = ingest(args.exports, args.output, question_text(args.questions), args.year, args.block_mb)
+    except IngestError as error:
+        sys.exit(f"Cannot ingest: {error}")
+    print(f"Wrote {rows} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
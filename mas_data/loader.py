@@ -0,0 +1,88 @@
+"""Typed, column-projected loading of the MAS records parquet file."""
+
+import logging
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+from .schema import RECORDS_PATH, RESPONDENT_COLUMN, WEIGHT_COLUMNS, YEAR_COLUMN
+
+logger = logging.getLogger(__name__)
+
+YEAR_PARTITIONING = ds.partitioning(pa.schema([(YEAR_COLUMN, pa.int16())]), flavor="hive")
+
+
+def compact_table(table):
+    """Cast a records table to compact types.
+
+    Text columns become dictionary encoded (categoricals once in pandas),
+    the survey year becomes int16, respondent ids int32 and the weights
+    float32.
+    """
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column = column.dictionary_encode()
+        elif field.name == YEAR_COLUMN:
+            column = column.cast(pa.int16())
+        elif field.name == RESPONDENT_COLUMN:
+            column = column.cast(pa.int32())
+        elif field.name in WEIGHT_COLUMNS:
+            column = column.cast(pa.float32())
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+
+def load_records(columns=None, path=RECORDS_PATH):
+    """Load the records file as a compact DataFrame.
+
+    Only ``columns`` are read from disk (all of them when None). Memory use of
+    the decoded file and of the compact frame is logged.
+    """
+    table = pq.read_table(path, columns=columns)
+    before = table.nbytes
+    df = compact_table(table).to_pandas()
+    after = int(df.memory_usage(deep=True).sum())
+    logger.info(
+        "Loaded %s: %d rows x %d columns, %.1f MB decoded -> %.1f MB compact",
+        path, len(df), df.shape[1], before / 1e6, after / 1e6,
+    )
+    return df
+
+
+def write_years(frame, root, format="parquet"):
+    """Write ``frame`` under ``root`` as one ``survey year=<y>`` directory per year.
+
+    Only the directories of the years in ``frame`` are replaced, so a new
+    survey year can be added without touching the others. With
+    ``format="ipc"`` the files are uncompressed Arrow IPC files, which
+    :func:`read_years` reads without decoding.
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(None)
+    table = table.set_column(
+        table.schema.get_field_index(YEAR_COLUMN),
+        YEAR_COLUMN,
+        table.column(YEAR_COLUMN).cast(pa.int16()),
+    )
+    ds.write_dataset(
+        table,
+        root,
+        format=format,
+        partitioning=YEAR_PARTITIONING,
+        basename_template="part-{i}." + ("arrow" if format == "ipc" else "parquet"),
+        existing_data_behavior="delete_matching",
+    )
+
+
+def read_years(root, format="parquet"):
+    """Read every year written by :func:`write_years` into one DataFrame.
+
+    Arrow IPC files are memory-mapped, so reading them skips Parquet
+    decoding. Converting to pandas still copies every column, so the frame
+    does not share memory with the files and IPC saves only the decoding.
+    """
+    filesystem = fs.LocalFileSystem(use_mmap=format == "ipc")
+    dataset = ds.dataset(root, format=format, partitioning=YEAR_PARTITIONING, filesystem=filesystem)
+    return dataset.to_table().to_pandas()
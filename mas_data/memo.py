@@ -0,0 +1,75 @@
+"""Thread-safe, size-bounded LRU memo shared by every session.
+
+The cube's and respondent matrix's memos keep ``MAS_MEMO_ENTRIES`` (512)
+results each, for at most ``MAS_MEMO_TTL`` seconds (unset: no expiry).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Default number of results a memo keeps, and seconds it keeps them (None: no expiry)
+MEMO_ENTRIES = int(os.environ.get("MAS_MEMO_ENTRIES", "512"))
+MEMO_TTL = float(os.environ["MAS_MEMO_TTL"]) if os.environ.get("MAS_MEMO_TTL") else None
+
+
+class LRUMemo:
+    """Results of ``compute`` callables, keyed by hashable keys.
+
+    At most ``max_entries`` results are kept; the least recently used one is
+    evicted first. With ``ttl`` (seconds) a result older than that is
+    recomputed. Two threads missing the same key at once may both compute
+    it; the second result replaces the first.
+    """
+
+    def __init__(self, max_entries=MEMO_ENTRIES, ttl=MEMO_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute):
+        """The memoized result for ``key``, calling ``compute()`` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or self._clock() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """Entry count and hit, miss, eviction and expiration counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,100 @@
+"""Year-over-year "biggest movers" across every question, group and response.
+
+:func:`rank_movers` compares every cube row with the same question,
+demographic, group and response in the previous survey year that group
+answered the question, and ranks the pairs by the size of the change in
+percentage points. It is one sort, one merge and a few array operations
+over the cube, so it runs live when there is no fresh build; the data build
+writes its result as ``movers.parquet``.
+
+Usage::
+
+    python -m mas_data.movers --top 20
+    python -m mas_data.movers --year 2025 --demographic Race
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from .schema import RECORDS_PATH, YEAR_COLUMN
+
+GROUP_KEYS = ["question", "demographic", "group"]
+MOVERS_COLUMNS = GROUP_KEYS + [
+    "response",
+    "previous year",
+    YEAR_COLUMN,
+    "previous percent",
+    "percent",
+    "change",
+    "previous group n",
+    "group n",
+    "suppressed",
+]
+
+
+def rank_movers(cube):
+    """Every (question, group, response) change between consecutive survey years.
+
+    ``cube`` is a cube frame (see ``mas_data.cube``). A group's previous year
+    is the last earlier year with any answers from that group to the question,
+    so gaps between waves (2021 to 2023) count as consecutive. Responses
+    offered in only one of the two years have no change and are left out.
+    ``change`` is ``percent - previous percent``; ``group n`` is the group's
+    unweighted number of answers; ``suppressed`` marks groups suppressed in
+    either year. Sorted by absolute change, largest first.
+    """
+    group_years = cube.groupby(GROUP_KEYS + [YEAR_COLUMN], sort=True).agg(
+        **{"group n": ("n", "sum"), "suppressed": ("suppressed", "any")}
+    ).reset_index()
+    keys = group_years[GROUP_KEYS].to_numpy()
+    same_group = np.zeros(len(group_years), dtype=bool)
+    same_group[1:] = (keys[1:] == keys[:-1]).all(axis=1)
+    years = group_years[YEAR_COLUMN].to_numpy()
+    group_years["previous year"] = np.where(same_group, np.roll(years, 1), -1)
+    group_years["previous group n"] = np.where(same_group, np.roll(group_years["group n"].to_numpy(), 1), 0)
+    group_years["suppressed"] |= np.roll(group_years["suppressed"].to_numpy(), 1) & same_group
+    group_years = group_years[same_group]
+
+    current = cube[GROUP_KEYS + [YEAR_COLUMN, "response", "percent"]].merge(group_years, on=GROUP_KEYS + [YEAR_COLUMN])
+    previous = cube[GROUP_KEYS + [YEAR_COLUMN, "response", "percent"]].rename(
+        columns={YEAR_COLUMN: "previous year", "percent": "previous percent"}
+    )
+    movers = current.merge(previous.astype({"previous year": current["previous year"].dtype}), on=GROUP_KEYS + ["previous year", "response"])
+    movers["change"] = movers["percent"] - movers["previous percent"]
+    order = np.argsort(-np.abs(movers["change"].to_numpy()), kind="stable")
+    return movers.iloc[order][MOVERS_COLUMNS].reset_index(drop=True)
+
+
+def main():
+    from .snapshot import DataSnapshot
+
+    parser = argparse.ArgumentParser(description="Rank year-over-year changes across every question, group and response.")
+    parser.add_argument("--source", default=RECORDS_PATH, help="records parquet file")
+    parser.add_argument("--top", type=int, default=20, help="number of movers to print")
+    parser.add_argument("--year", type=int, help="only changes into this survey year")
+    parser.add_argument("--demographic", help="only groups of this demographic (Metro for the whole region)")
+    parser.add_argument("--min-n", type=int, default=0, help="smallest group n in both years")
+    parser.add_argument("--include-suppressed", action="store_true", help="keep groups too small to report")
+    args = parser.parse_args()
+
+    cube = DataSnapshot(args.source).cube.frame
+    start = time.perf_counter()
+    movers = rank_movers(cube)
+    elapsed = time.perf_counter() - start
+    movers = movers[(movers["group n"] >= args.min_n) & (movers["previous group n"] >= args.min_n)]
+    if not args.include_suppressed:
+        movers = movers[~movers["suppressed"]]
+    if args.year is not None:
+        movers = movers[movers[YEAR_COLUMN] == args.year]
+    if args.demographic is not None:
+        movers = movers[movers["demographic"] == args.demographic]
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(movers.head(args.top).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    print(f"Ranked {len(cube)} cube rows in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
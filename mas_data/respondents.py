@@ -0,0 +1,179 @@
+"""Respondent-level wide matrix for cross-question analysis.
+
+The records hold one row per respondent and answered question. The matrix
+turns them around into one row per respondent, keyed by survey year and
+``survID``. It has one integer column per question holding the code of the
+respondent's response (-1 when the question went unanswered), plus the
+weights, demographics and Atlanta resident flag, which are the same on all
+of a respondent's records.
+
+:meth:`RespondentMatrix.crosstab` cross-tabulates two questions without
+joining records. It one-hot encodes both questions' response codes for the
+respondents who answered both, and a weighted two-way table is then a single
+matrix product, ``A.T @ (w * B)``.
+
+:meth:`RespondentMatrix.breakdown` splits one question's responses by the
+groups of two demographics at once (e.g. Race by Homeownership), with a
+single crosstab on the aggregation backend (see ``mas_data.backends``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .backends import get_backend
+from .bitmap import BitmapIndex
+from .dataset import freeze_frame
+from .memo import MEMO_ENTRIES, MEMO_TTL, LRUMemo
+from .stats import effective_n, margin_of_error, suppressed
+from .schema import (
+    ATLANTA_DEMOGRAPHIC,
+    ATLANTA_GROUP,
+    DEMO_COL_MAP,
+    RESPONDENT_COLUMN,
+    TOTAL_DEMOGRAPHIC,
+    TOTAL_GROUP,
+    WEIGHT_COLUMNS,
+    YEAR_COLUMN,
+)
+
+# Respondent columns copied from the first record of each respondent
+RESPONDENT_COLUMNS = WEIGHT_COLUMNS + list(DEMO_COL_MAP.values()) + ["atlanta resident"]
+
+# Columns with a bitmap per value, which select a group's respondents
+INDEXED_COLUMNS = list(DEMO_COL_MAP.values()) + ["atlanta resident"]
+
+
+def _one_hot(codes):
+    """``(labels, matrix)``: the distinct codes and one indicator column per code."""
+    labels, inverse = np.unique(codes, return_inverse=True)
+    return labels, np.eye(len(labels))[inverse]
+
+
+class RespondentMatrix:
+    """One row per respondent, one response code column per question.
+
+    Rows are sorted by survey year and ``survID``, so each year is a
+    contiguous range. Codes index into ``responses``, the response labels of
+    the records. ``index`` holds a bitmap of every demographic value and the
+    Atlanta resident flag, which selects a group's respondents within a
+    year's range. Crosstab results are memoized in ``memo`` like the cube's
+    lookups; callers get shallow copies.
+    """
+
+    def __init__(self, frame, memo=None):
+        self.memo = memo if memo is not None else LRUMemo(MEMO_ENTRIES, MEMO_TTL)
+        years = frame[YEAR_COLUMN].to_numpy().astype(np.int64)
+        ids = frame[RESPONDENT_COLUMN].to_numpy().astype(np.int64)
+        keys, first, row = np.unique(years << 32 | ids, return_index=True, return_inverse=True)
+
+        self.questions = frame["question"].cat.categories.astype(str).tolist()
+        self.responses = frame["response"].cat.categories.astype(str)
+        codes = np.full((len(keys), len(self.questions)), -1, dtype=np.int16)
+        codes[row, frame["question"].cat.codes.to_numpy()] = frame["response"].cat.codes.to_numpy()
+
+        columns = {YEAR_COLUMN: (keys >> 32).astype(np.int16), RESPONDENT_COLUMN: (keys & 0xFFFFFFFF).astype(np.int32)}
+        columns.update(zip(self.questions, codes.T))
+        columns.update({column: frame[column].iloc[first].reset_index(drop=True) for column in RESPONDENT_COLUMNS})
+        self.frame = freeze_frame(pd.DataFrame(columns))
+
+        year_values, starts = np.unique(self.frame[YEAR_COLUMN].to_numpy(), return_index=True)
+        stops = np.append(starts[1:], len(self.frame))
+        self._years = {int(year): (start, stop) for year, start, stop in zip(year_values, starts, stops)}
+        self.index = BitmapIndex(self.frame, INDEXED_COLUMNS)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _group(self, demographic, group, start, stop):
+        """``(members, weights)`` of one group's respondents in rows ``start:stop``."""
+        countywt = self.frame["countywt"].to_numpy()[start:stop]
+        if demographic == TOTAL_DEMOGRAPHIC:
+            return np.ones(stop - start, dtype=bool), countywt
+        if demographic == ATLANTA_DEMOGRAPHIC and group == ATLANTA_GROUP:
+            return self.index.mask({"atlanta resident": "Yes"}, start, stop), self.frame["atlwt"].to_numpy()[start:stop]
+        return self.index.mask({DEMO_COL_MAP[demographic]: group}, start, stop), countywt
+
+    def crosstab(self, question_a, question_b, year, demographic=TOTAL_DEMOGRAPHIC, group=TOTAL_GROUP):
+        """Weighted two-way table of ``question_a`` by ``question_b`` for one year and group.
+
+        Counts respondents who answered both questions. Returns response_a,
+        response_b, weight, n and percent, the share of each ``question_a``
+        response's weight that gave each ``question_b`` response, with the
+        effective sample size of the ``question_a`` response (n_eff), the
+        percent's margin of error (moe), the unweighted number of respondents
+        with the ``question_a`` response (group_n) and whether that row is
+        too small to report (suppressed, see ``mas_data.stats``).
+        """
+        def compute():
+            start, stop = self._years.get(year, (0, 0))
+            a = self.frame[question_a].to_numpy()[start:stop]
+            b = self.frame[question_b].to_numpy()[start:stop]
+            members, weights = self._group(demographic, group, start, stop)
+            rows = members & (a >= 0) & (b >= 0)
+            # Missing weights count towards n but not the weight sums, as in the cube
+            weights = np.nan_to_num(weights[rows].astype("float64"))
+            a_labels, one_a = _one_hot(a[rows])
+            b_labels, one_b = _one_hot(b[rows])
+            n = one_a.T @ one_b
+            weight = one_a.T @ (weights[:, None] * one_b)
+            weight_sq = one_a.T @ ((weights * weights)[:, None] * one_b)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                percent = weight / weight.sum(axis=1, keepdims=True)
+            n_eff = np.broadcast_to(effective_n(weight.sum(axis=1, keepdims=True), weight_sq.sum(axis=1, keepdims=True)), n.shape)
+            group_n = np.broadcast_to(n.sum(axis=1, keepdims=True), n.shape).astype(np.int64)
+            cells = np.nonzero(n)
+            return pd.DataFrame({
+                "response_a": self.responses[a_labels[cells[0]]],
+                "response_b": self.responses[b_labels[cells[1]]],
+                "weight": weight[cells],
+                "n": n[cells].astype(np.int64),
+                "percent": percent[cells],
+                "n_eff": n_eff[cells],
+                "moe": margin_of_error(percent[cells], n_eff[cells]),
+                "group_n": group_n[cells],
+                "suppressed": suppressed(group_n[cells], n_eff[cells]),
+            })
+        key = ("crosstab", question_a, question_b, year, demographic, group)
+        return self.memo.get(key, compute).copy(deep=False)
+
+    def breakdown(self, question, year, demographic, second):
+        """Responses to ``question`` by every pair of groups of two demographics.
+
+        Returns group, second_group, response, weight, n, percent (the share
+        of the pair's weight), n_eff and moe (as in the cube), group_n, the
+        unweighted number of respondents in the pair, and suppressed, whether
+        the pair is too small to report. Both demographics use ``countywt``;
+        Jurisdiction groups are counties, without the separately weighted
+        City of Atlanta.
+        """
+        def compute():
+            start, stop = self._years.get(year, (0, 0))
+            rows = self.frame.iloc[start:stop]
+            first, other = rows[DEMO_COL_MAP[demographic]], rows[DEMO_COL_MAP[second]]
+            keys = {
+                "group": first.cat.codes.to_numpy(),
+                "second_group": other.cat.codes.to_numpy(),
+                "response": rows[question].to_numpy(),
+            }
+            answered = (keys["group"] >= 0) & (keys["second_group"] >= 0) & (keys["response"] >= 0)
+            keys = {name: codes[answered] for name, codes in keys.items()}
+            weights = np.nan_to_num(rows["countywt"].to_numpy()[answered].astype("float64"))
+            backend = get_backend()
+            sums = backend.crosstab(keys, weights)
+            percent = backend.normalize(sums, ["group", "second_group"])
+            pair_sums = sums.groupby(["group", "second_group"])[["n", "weight", "weight_sq"]].transform("sum")
+            n_eff = effective_n(pair_sums["weight"], pair_sums["weight_sq"])
+            group_n = pair_sums["n"].to_numpy(dtype=np.int64)
+            return pd.DataFrame({
+                "group": first.cat.categories.astype(str)[sums["group"].to_numpy()],
+                "second_group": other.cat.categories.astype(str)[sums["second_group"].to_numpy()],
+                "response": self.responses[sums["response"].to_numpy()],
+                "weight": sums["weight"].to_numpy(),
+                "n": sums["n"].to_numpy(dtype=np.int64),
+                "percent": percent,
+                "n_eff": n_eff,
+                "moe": margin_of_error(percent, n_eff),
+                "group_n": group_n,
+                "suppressed": suppressed(group_n, n_eff),
+            })
+        return self.memo.get(("breakdown", question, year, demographic, second), compute).copy(deep=False)
@@ -0,0 +1,49 @@
+"""Column names and file locations for the MAS records data."""
+
+RECORDS_PATH = "Data/MAS_Dashboard_Records_2025_Updated.parquet"
+
+YEAR_COLUMN = "survey year"
+RESPONDENT_COLUMN = "survID"
+# survID numbers respondents within a survey year
+RESPONDENT_KEY = [YEAR_COLUMN, RESPONDENT_COLUMN]
+WEIGHT_COLUMNS = ["countywt", "atlwt"]
+
+# Columns describing the question and answer on each record
+QUESTION_COLUMNS = ["question", "q_short", "q_verb", "response"]
+
+# Demographic Breakdown page options and the record column behind each one
+DEMO_COL_MAP = {
+    "Jurisdiction": "county",
+    "Race": "black or white",
+    "Hispanic": "latino",
+    "Gender": "gender",
+    "Age": "age group more categories",
+    "Yrs in Metro": "years in metro Atl categorized",
+    "Education": "education",
+    "Income": "income",
+    "Homeownership": "homeownership",
+    "Employment": "employment status",
+    "Work Setting": "remote worker status",
+}
+DEMOGRAPHIC_COLUMNS = list(DEMO_COL_MAP.values())
+
+# City of Atlanta residents are reported as their own jurisdiction, weighted by atlwt
+ATLANTA_GROUP = "Atlanta"
+ATLANTA_DEMOGRAPHIC = "Jurisdiction"
+
+# Demographic and group labels used for whole-region (Metro Summary) results
+TOTAL_DEMOGRAPHIC = "Metro"
+TOTAL_GROUP = "All"
+
+# Columns each page actually reads, so the loader can skip the rest of the file
+METRO_COLUMNS = QUESTION_COLUMNS + [YEAR_COLUMN, "countywt"]
+DEMOGRAPHIC_PAGE_COLUMNS = METRO_COLUMNS + DEMOGRAPHIC_COLUMNS + ["atlanta resident", "atlwt"]
+
+# The Cross Question page pairs each respondent's answers to two questions
+CROSS_QUESTION_COLUMNS = DEMOGRAPHIC_PAGE_COLUMNS + [RESPONDENT_COLUMN]
+
+# All pages share one dataset, so it holds the union of their columns
+DASHBOARD_COLUMNS = list(dict.fromkeys(METRO_COLUMNS + DEMOGRAPHIC_PAGE_COLUMNS + CROSS_QUESTION_COLUMNS))
+
+# Derived artifacts written by the data build (see mas_data/build.py)
+BUILD_PATH = "Data/build"
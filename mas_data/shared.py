@@ -0,0 +1,41 @@
+"""Process-wide data handles shared by every Streamlit session and page.
+
+``st.cache_resource`` hands every caller the same object instead of an
+unpickled copy, so reruns cost nothing and memory does not grow with the
+number of open browser tabs. Callers must treat these objects as read-only.
+
+Everything is read from the data build when it is fresh and computed in
+memory from the records file otherwise (see ``mas_data.build``). Builds made
+with ``--ipc`` load the records from their Arrow IPC fact table, skipping
+Parquet decoding. When the records file or the build changes, a new
+snapshot is loaded in the background and swapped in without a restart (see
+``mas_data.snapshot``).
+"""
+
+import os
+
+import streamlit as st
+
+from .schema import BUILD_PATH, RECORDS_PATH
+from .snapshot import WATCH_INTERVAL_SECONDS, SnapshotStore
+
+# Set MAS_REQUIRE_BUILD=1 to refuse to start rather than compute derived data in memory
+REQUIRE_BUILD = os.environ.get("MAS_REQUIRE_BUILD") == "1"
+
+# Seconds between checks for changed data files; 0 turns reloading off
+WATCH_INTERVAL = float(os.environ.get("MAS_WATCH_INTERVAL", WATCH_INTERVAL_SECONDS))
+
+
+@st.cache_resource(show_spinner="Loading survey data...")
+def get_store():
+    """The process-wide snapshot store, watching the records file and build."""
+    return SnapshotStore(RECORDS_PATH, BUILD_PATH, require_build=REQUIRE_BUILD, interval=WATCH_INTERVAL)
+
+
+def get_snapshot():
+    """The current data snapshot.
+
+    Take it once at the top of a page and read everything from it, so a
+    rerun never mixes data from before and after a reload.
+    """
+    return get_store().current
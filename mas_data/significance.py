@@ -0,0 +1,190 @@
+"""Significance tests on the cube's weighted percentages.
+
+The survey is weighted, so tests on raw respondent counts would overstate
+how sure we can be. Both tests here use Kish effective sample sizes (see
+``mas_data.stats``) in place of respondent counts:
+
+- :func:`chi_square_test` asks whether responses differ across the groups at
+  all, with a first-order Rao-Scott correction: the Pearson statistic of
+  the weighted table is divided by the table's design effect.
+- :func:`pairwise_tests` compares every pair of groups on every response
+  with a two-proportion z-test, all pairs and responses at once in a few
+  array operations. P-values are Holm-adjusted across the pairs of each
+  response.
+- :func:`year_over_year_tests` tests every change in a trend from one survey
+  year to the group's previous one, for all groups and responses at once;
+  :func:`change_notes` labels those changes for chart tooltips.
+
+The first two take cube crosstab cells with each cell's ``weight_sq`` as
+well, and the last a cube trend (see ``mas_data.cube``). Suppressed groups,
+and the City of Atlanta, which overlaps the counties it lies in, are left
+out. The cube memoizes every result next to the crosstab or trend it came
+from.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .schema import ATLANTA_DEMOGRAPHIC, ATLANTA_GROUP, YEAR_COLUMN
+from .stats import standard_error
+
+# Significance level of every test
+ALPHA = 0.05
+
+ChiSquareTest = namedtuple("ChiSquareTest", ["statistic", "df", "p_value", "design_effect"])
+
+PAIRWISE_COLUMNS = ["group", "other_group", "response", "difference", "z", "p_value", "p_adjusted", "significant"]
+# Columns year_over_year_tests adds to a trend
+CHANGE_COLUMNS = ["previous year", "change", "z", "p_value", "significant"]
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def normal_p_value(z):
+    """Two-sided p-values of standard normal statistics ``z``."""
+    return _erfc(np.abs(np.asarray(z, dtype="float64")) / math.sqrt(2))
+
+
+def chi_square_p_value(statistic, df):
+    """Upper-tail p-value of a chi-square ``statistic`` with ``df`` degrees of freedom.
+
+    Uses the closed form of the survival function for whole-number degrees
+    of freedom.
+    """
+    half = statistic / 2
+    if df % 2 == 0:
+        term = total = 1.0
+        for k in range(1, df // 2):
+            term *= half / k
+            total += term
+        return math.exp(-half) * total
+    total = math.erfc(math.sqrt(half))
+    term = math.sqrt(2 * statistic / math.pi) * math.exp(-half)
+    for k in range(1, (df + 1) // 2):
+        total += term
+        term *= statistic / (2 * k + 1)
+    return min(total, 1.0)
+
+
+def _table(crosstab, demographic):
+    """``(groups, responses, percent, weight, weight_sq, n, n_eff)`` arrays of the groups that are tested.
+
+    The first four are per cell; ``n_eff`` is per group.
+    """
+    rows = crosstab[~crosstab["suppressed"]]
+    if demographic == ATLANTA_DEMOGRAPHIC:
+        rows = rows[rows["group"] != ATLANTA_GROUP]
+    groups, group = np.unique(rows["group"].to_numpy().astype(str), return_inverse=True)
+    responses, response = np.unique(rows["response"].to_numpy().astype(str), return_inverse=True)
+    cells = {name: np.zeros((len(groups), len(responses))) for name in ["percent", "weight", "weight_sq", "n"]}
+    for name, values in cells.items():
+        values[group, response] = rows[name].to_numpy()
+    n_eff = np.zeros(len(groups))
+    n_eff[group] = rows["n_eff"].to_numpy()
+    return groups, responses, cells["percent"], cells["weight"], cells["weight_sq"], cells["n"], n_eff
+
+
+def chi_square_test(crosstab, demographic):
+    """Rao-Scott test of independence between groups and responses.
+
+    The design effect is the Kish one of the tested cells, their respondent
+    count over their effective sample size, which comes from the cells'
+    weight and squared weight sums, so responses left out of ``crosstab``
+    leave the design effect too. Returns a :class:`ChiSquareTest`, with NaN
+    statistics when fewer than two groups or responses are tested.
+    """
+    groups, responses, _, weight, weight_sq, n, _ = _table(crosstab, demographic)
+    total = weight.sum()
+    if len(groups) < 2 or len(responses) < 2 or total <= 0:
+        return ChiSquareTest(math.nan, 0, math.nan, math.nan)
+    share = weight / total
+    expected = np.outer(share.sum(axis=1), share.sum(axis=0))
+    table_n_eff = total ** 2 / weight_sq.sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pearson = np.nansum((share - expected) ** 2 / expected)
+    statistic = float(table_n_eff * pearson)
+    df = (len(groups) - 1) * (len(responses) - 1)
+    return ChiSquareTest(statistic, df, chi_square_p_value(statistic, df), float(n.sum() / table_n_eff))
+
+
+def pairwise_tests(crosstab, demographic):
+    """Every ordered pair of groups compared on every response.
+
+    Returns group, other_group, response, difference (the group's percent
+    minus the other group's), z, p_value, p_adjusted (Holm-adjusted across
+    the pairs of each response) and significant (``p_adjusted < ALPHA``).
+    Each unordered pair appears twice, once from each side.
+    """
+    groups, responses, percent, _, _, _, n_eff = _table(crosstab, demographic)
+    first, second = np.triu_indices(len(groups), 1)
+    n_first, n_second = n_eff[first, None], n_eff[second, None]
+    difference = percent[first] - percent[second]
+    pooled = (n_first * percent[first] + n_second * percent[second]) / (n_first + n_second)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = difference / np.sqrt(pooled * (1 - pooled) * (1 / n_first + 1 / n_second))
+    p_value = np.where(np.isnan(z), 1.0, normal_p_value(z))
+
+    # Holm step-down: the k-th smallest of m p-values is scaled by m - k, then made monotone
+    pairs = len(first)
+    order = np.argsort(p_value, axis=0, kind="stable")
+    scaled = (pairs - np.arange(pairs))[:, None] * np.take_along_axis(p_value, order, axis=0)
+    p_adjusted = np.empty_like(p_value)
+    np.put_along_axis(p_adjusted, order, np.minimum(np.maximum.accumulate(scaled, axis=0), 1), axis=0)
+
+    both = np.concatenate
+    count = len(responses)
+    return pd.DataFrame({
+        "group": groups[both([np.repeat(first, count), np.repeat(second, count)])],
+        "other_group": groups[both([np.repeat(second, count), np.repeat(first, count)])],
+        "response": np.tile(responses, 2 * pairs),
+        "difference": both([difference.ravel(), -difference.ravel()]),
+        "z": both([z.ravel(), -z.ravel()]),
+        "p_value": np.tile(p_value.ravel(), 2),
+        "p_adjusted": np.tile(p_adjusted.ravel(), 2),
+        "significant": np.tile(p_adjusted.ravel() < ALPHA, 2),
+    })[PAIRWISE_COLUMNS]
+
+
+def year_over_year_tests(trend):
+    """``trend`` with every row's change since the previous year tested.
+
+    ``trend`` is a cube trend, of one group or (with a ``group`` column) of
+    several. A group's previous year is the last earlier year it was
+    reported in, skipping suppressed years, as the charts do. The change is
+    tested with a z-test on the two years' weighted standard errors, which
+    come from each year's percent and ``n_eff``. Adds previous year (NaN in
+    a group's first year and for responses it did not give then), change,
+    z, p_value and significant (``p_value < ALPHA``) columns.
+    """
+    frame = trend.assign(_group=trend["group"] if "group" in trend.columns else "")
+    reported = frame[~frame["suppressed"]]
+    years = reported[["_group", YEAR_COLUMN]].drop_duplicates().sort_values(["_group", YEAR_COLUMN])
+    years["previous year"] = years.groupby("_group")[YEAR_COLUMN].shift().astype("float64")
+    previous = reported[["_group", YEAR_COLUMN, "response", "percent", "n_eff"]].rename(
+        columns={YEAR_COLUMN: "previous year", "percent": "previous percent", "n_eff": "previous n_eff"}
+    )
+    previous["previous year"] = previous["previous year"].astype("float64")
+    frame = frame.merge(years, on=["_group", YEAR_COLUMN], how="left").merge(
+        previous, on=["_group", "previous year", "response"], how="left"
+    )
+    tested = frame["previous percent"].notna().to_numpy()
+    frame.loc[~tested, "previous year"] = np.nan
+    frame["change"] = frame["percent"] - frame["previous percent"]
+    spread = np.hypot(standard_error(frame["percent"], frame["n_eff"]), standard_error(frame["previous percent"], frame["previous n_eff"]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frame["z"] = frame["change"].to_numpy() / spread
+    frame["p_value"] = np.where(tested & ~np.isnan(frame["z"].to_numpy()), normal_p_value(frame["z"].fillna(0)), np.nan)
+    frame["significant"] = frame["p_value"].to_numpy() < ALPHA
+    return frame[list(trend.columns) + CHANGE_COLUMNS]
+
+
+def change_notes(trend):
+    """Tooltip text for each row of a tested trend, e.g. ``"+4.2 pts (significant)"``.
+
+    Rows without a previous year get an empty note.
+    """
+    points = (trend["change"] * 100).map("{:+.1f} pts".format).where(trend["change"].notna(), "")
+    return points + trend["significant"].map({True: " (significant)", False: ""})
@@ -0,0 +1,199 @@
+"""Immutable data snapshots that follow changes to the records file and data build.
+
+A :class:`DataSnapshot` bundles everything the pages read for one version of
+the data: the catalog, the cube, the movers, the records dataset and the
+respondent matrix. Derived data is computed on the snapshot and never
+changes afterwards.
+
+:class:`SnapshotStore` holds the current snapshot and a background thread
+that polls the records file and the build manifest. When either one's
+content changes (a new modification time or size, confirmed by its hash), the
+thread loads a new snapshot and swaps it in with a single assignment. A rerun
+that already took the old snapshot finishes on it, the next rerun sees the
+new one, and every derived cache goes away with the old snapshot.
+
+Replace watched files atomically (write elsewhere, then move into place), as
+``mas_data.build`` does, so the watcher never hashes a half-written file.
+"""
+
+import logging
+import os
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+from .build import (
+    MANIFEST_FILE,
+    StaleBuildError,
+    artifact_path,
+    check_build,
+    file_sha256,
+    question_catalog,
+    read_artifact,
+)
+from .cube import AggregateCube, build_cube
+from .dataset import RecordsDataset, load_dataset
+from .movers import rank_movers
+from .respondents import RespondentMatrix
+from .schema import BUILD_PATH, DASHBOARD_COLUMNS, RECORDS_PATH
+from .star import denormalize, read_dimensions
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the watched files
+WATCH_INTERVAL_SECONDS = 5
+
+FileVersion = namedtuple("FileVersion", ["mtime_ns", "size", "sha256"])
+
+
+def file_version(path, previous=None):
+    """Version of the file at ``path``, or None if it does not exist.
+
+    The file is only re-hashed when its modification time or size differ
+    from ``previous``.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+        return previous
+    return FileVersion(stat.st_mtime_ns, stat.st_size, file_sha256(path))
+
+
+def _content(version):
+    return version.sha256 if version else None
+
+
+class DataSnapshot:
+    """One version of the records and everything derived from it.
+
+    ``catalog`` and ``cube`` come from the data build when it is fresh and
+    are computed in memory from the records file otherwise. Each attribute is
+    loaded on first use, once, and shared by every session holding the
+    snapshot, which must treat it as read-only.
+    """
+
+    def __init__(self, source=RECORDS_PATH, root=BUILD_PATH, require_build=False):
+        self.source = source
+        self.root = root
+        reason = check_build(root, source)
+        if reason is not None and require_build:
+            raise StaleBuildError(f"{root}: {reason}. Run `python -m mas_data.build`.")
+        if reason is not None:
+            logger.warning("Computing derived data in memory because %s: %s", root, reason)
+        self.fresh = reason is None
+        self._lock = threading.RLock()
+        self._values = {}
+
+    def _once(self, name, load):
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = load()
+            return self._values[name]
+
+    @property
+    def dataset(self):
+        """The full records dataset."""
+        def load():
+            if self.fresh:
+                return RecordsDataset(denormalize(read_artifact("facts", self.root), self.dimensions))
+            return load_dataset(DASHBOARD_COLUMNS, self.source)
+        return self._once("dataset", load)
+
+    @property
+    def dimensions(self):
+        """Star-schema dimension tables of the data build."""
+        return self._once("dimensions", lambda: read_dimensions(self.root))
+
+    @property
+    def catalog(self):
+        """Questions, question text and survey years available in the data."""
+        def load():
+            if self.fresh:
+                return pd.read_parquet(artifact_path("catalog", self.root))
+            return question_catalog(self.dataset.frame)
+        return self._once("catalog", load)
+
+    @property
+    def cube(self):
+        """Weighted aggregate cube behind both pages."""
+        def load():
+            if self.fresh:
+                return AggregateCube(read_artifact("cube", self.root))
+            return AggregateCube(build_cube(self.dataset.frame))
+        return self._once("cube", load)
+
+    @property
+    def movers(self):
+        """Year-over-year changes of every question, group and response, largest first."""
+        def load():
+            if self.fresh:
+                return pd.read_parquet(artifact_path("movers", self.root))
+            return rank_movers(self.cube.frame)
+        return self._once("movers", load)
+
+    @property
+    def respondents(self):
+        """Respondent-level wide matrix behind the Cross Question page."""
+        return self._once("respondents", lambda: RespondentMatrix(self.dataset.frame))
+
+
+class SnapshotStore:
+    """The current :class:`DataSnapshot`, reloaded when the data files change.
+
+    The first snapshot is loaded in the constructor. With a positive
+    ``interval`` a daemon thread then calls :meth:`check` every ``interval``
+    seconds. A failed reload is logged and the current snapshot kept.
+    """
+
+    def __init__(self, source=RECORDS_PATH, root=BUILD_PATH, require_build=False, interval=WATCH_INTERVAL_SECONDS):
+        self.source = source
+        self.root = root
+        self.require_build = require_build
+        self.interval = interval
+        self.paths = [source, os.path.join(root, MANIFEST_FILE)]
+        self._versions = self._poll({})
+        self.current = self._load()
+        self._stop = threading.Event()
+        if interval > 0:
+            threading.Thread(target=self._watch, name="mas-data-watcher", daemon=True).start()
+
+    def _poll(self, previous):
+        return {path: file_version(path, previous.get(path)) for path in self.paths}
+
+    def _load(self):
+        snapshot = DataSnapshot(self.source, self.root, self.require_build)
+        # Load what the pages read before any session can see the snapshot
+        snapshot.catalog
+        snapshot.cube
+        return snapshot
+
+    def check(self):
+        """Swap in a new snapshot if a watched file changed; return whether it did."""
+        versions = self._poll(self._versions)
+        changed = [path for path in self.paths if _content(versions[path]) != _content(self._versions[path])]
+        self._versions = versions
+        if not changed:
+            return False
+        logger.info("Reloading survey data because %s changed", ", ".join(changed))
+        try:
+            snapshot = self._load()
+        except Exception:
+            logger.exception("Reloading survey data failed, still serving the previous snapshot")
+            return False
+        logger.info("Replaced survey data snapshot; its cube lookups: %s", self.current.cube.memo.stats())
+        self.current = snapshot
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Checking %s for changes failed", ", ".join(self.paths))
+
+    def close(self):
+        """Stop watching the data files."""
+        self._stop.set()
@@ -0,0 +1,153 @@
+"""Star-schema storage for the records: integer fact table plus dimension tables.
+
+The records repeat the question text, response labels and demographic labels
+on every row. Normalized, each label is stored once in a dimension table and
+the fact table keeps only small integer codes, the survey year and the
+weights:
+
+- ``questions``: question_id, question, q_short, q_verb
+- ``responses``: response_id, response
+- ``values``: column, value_id, value (every demographic column and the
+  Atlanta resident flag)
+- facts: question_id, response_id, one code column per demographic,
+  survey year, survID, countywt, atlwt (missing labels are coded -1)
+
+Code columns are always int16, whatever the number of labels, so years
+appended after a dimension outgrows int8 share one schema with the years
+written before.
+
+:func:`denormalize` turns facts back into the compact records frame the
+rest of the package uses, building categoricals directly on the fact codes.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .schema import DASHBOARD_COLUMNS, DEMOGRAPHIC_COLUMNS, RESPONDENT_KEY, WEIGHT_COLUMNS
+
+VALUE_COLUMNS = DEMOGRAPHIC_COLUMNS + ["atlanta resident"]
+
+# Columns stored in the facts as they are
+NUMERIC_COLUMNS = RESPONDENT_KEY + WEIGHT_COLUMNS
+
+# Type of every code column in the facts
+CODE_TYPE = np.int16
+
+STAR_FILES = {
+    "facts": "facts",
+    "questions": "dim_questions.parquet",
+    "responses": "dim_responses.parquet",
+    "values": "dim_values.parquet",
+}
+
+
+def _encode(column, labels):
+    """Codes of categorical ``column`` into ``labels``, extended by any categories it lacks.
+
+    Returns ``(codes, labels)``. Existing labels keep their position, so codes
+    written against the old labels stay valid.
+    """
+    categories = column.cat.categories.astype(str)
+    labels = pd.Index(labels, dtype=str)
+    labels = labels.append(categories.difference(labels, sort=False))
+    if len(labels) > np.iinfo(CODE_TYPE).max + 1:
+        raise ValueError(f"{column.name} has {len(labels)} labels, more than {CODE_TYPE.__name__} codes can hold")
+    positions = labels.get_indexer(categories)
+    codes = column.cat.codes.to_numpy()
+    codes = np.where(codes < 0, -1, positions[codes])
+    return codes.astype(CODE_TYPE), labels
+
+
+def _empty_dimensions():
+    return {
+        "questions": pd.DataFrame({"question_id": [], "question": [], "q_short": [], "q_verb": []}),
+        "responses": pd.DataFrame({"response_id": [], "response": []}),
+        "values": pd.DataFrame({"column": [], "value_id": [], "value": []}),
+    }
+
+
+def normalize(frame, dimensions=None):
+    """Split a compact records frame into ``(facts, dimensions)``.
+
+    With ``dimensions`` the fact codes refer to those tables, extended by any
+    labels they do not hold yet; otherwise new tables are built.
+    """
+    old = dimensions or _empty_dimensions()
+    facts = {}
+
+    known = old["questions"].sort_values("question_id")
+    facts["question_id"], questions = _encode(frame["question"], known["question"])
+    text = frame.groupby("question", observed=True)[["q_short", "q_verb"]].first()
+    text.index = text.index.astype(str)
+    text = known.set_index("question")[["q_short", "q_verb"]].combine_first(text).reindex(questions)
+
+    known = old["responses"].sort_values("response_id")
+    facts["response_id"], responses = _encode(frame["response"], known["response"])
+
+    values = []
+    for column in VALUE_COLUMNS:
+        known = old["values"][old["values"]["column"] == column].sort_values("value_id")["value"]
+        if column in frame.columns:
+            facts[column], known = _encode(frame[column], known)
+        values.append(pd.DataFrame({"column": column, "value_id": np.arange(len(known)), "value": known.astype(str)}))
+
+    for column in NUMERIC_COLUMNS:
+        if column in frame.columns:
+            facts[column] = frame[column].to_numpy()
+    dimensions = {
+        "questions": pd.DataFrame({
+            "question_id": np.arange(len(questions)),
+            "question": questions,
+            "q_short": text["q_short"].astype(str).to_numpy(),
+            "q_verb": text["q_verb"].astype(str).to_numpy(),
+        }),
+        "responses": pd.DataFrame({"response_id": np.arange(len(responses)), "response": responses}),
+        "values": pd.concat(values, ignore_index=True),
+    }
+    return pd.DataFrame(facts), dimensions
+
+
+def _categorical(codes, labels):
+    """Categorical of ``labels[codes]`` that reuses ``codes`` when labels are unique."""
+    labels = pd.Index(labels)
+    if labels.is_unique:
+        return pd.Categorical.from_codes(codes, categories=labels)
+    categories, inverse = np.unique(labels, return_inverse=True)
+    return pd.Categorical.from_codes(np.where(codes < 0, -1, inverse[codes]), categories=categories)
+
+
+def denormalize(facts, dimensions):
+    """Rebuild the compact records frame from facts and dimension tables."""
+    questions = dimensions["questions"].set_index("question_id").sort_index()
+    question_ids = facts["question_id"].to_numpy()
+    columns = {
+        "question": _categorical(question_ids, questions["question"]),
+        "q_short": _categorical(question_ids, questions["q_short"]),
+        "q_verb": _categorical(question_ids, questions["q_verb"]),
+        "response": _categorical(
+            facts["response_id"].to_numpy(),
+            dimensions["responses"].sort_values("response_id")["response"],
+        ),
+    }
+    values = dimensions["values"].sort_values(["column", "value_id"])
+    for column, labels in values.groupby("column", sort=False)["value"]:
+        if column in facts.columns:
+            columns[column] = _categorical(facts[column].to_numpy(), labels)
+    for column in NUMERIC_COLUMNS:
+        if column in facts.columns:
+            columns[column] = facts[column].to_numpy()
+    order = [column for column in DASHBOARD_COLUMNS if column in columns]
+    return pd.DataFrame({column: columns[column] for column in order}, copy=False)
+
+
+def write_dimensions(dimensions, root):
+    """Write the dimension tables under ``root``."""
+    for name, table in dimensions.items():
+        table.to_parquet(os.path.join(root, STAR_FILES[name]), index=False)
+
+
+def read_dimensions(root):
+    """Read the dimension tables written by :func:`write_dimensions`."""
+    return {name: pd.read_parquet(os.path.join(root, STAR_FILES[name])) for name in ["questions", "responses", "values"]}
@@ -0,0 +1,61 @@
+"""Sampling error of weighted survey percentages.
+
+The survey is weighted, so a group's answers carry less information than
+its raw count suggests. Kish's effective sample size,
+``n_eff = (sum w)^2 / sum w^2``, is the number of equally weighted
+respondents that would give the same precision. Margins of error are the
+half-widths of normal-approximation 95% intervals computed with ``n_eff``.
+Every function works element-wise on NumPy arrays or pandas columns.
+
+Groups too small to report are suppressed by a :class:`SuppressionRule`: a
+group is suppressed when its unweighted number of answers is below
+``min_n`` or its effective sample size is below ``min_n_eff``. The default
+rule comes from the ``MAS_MIN_GROUP_N`` (30) and ``MAS_MIN_EFFECTIVE_N`` (20)
+environment variables.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+SuppressionRule = namedtuple("SuppressionRule", ["min_n", "min_n_eff"])
+
+SUPPRESSION = SuppressionRule(
+    int(os.environ.get("MAS_MIN_GROUP_N", "30")),
+    float(os.environ.get("MAS_MIN_EFFECTIVE_N", "20")),
+)
+
+
+def effective_n(weight_sum, weight_sq_sum):
+    """Kish effective sample size from the sums of weights and squared weights."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.asarray(weight_sum, dtype="float64") ** 2 / np.asarray(weight_sq_sum, dtype="float64")
+
+
+def standard_error(percent, n_eff):
+    """Standard error of a share ``percent`` (0-1) over ``n_eff`` respondents."""
+    percent = np.asarray(percent, dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sqrt(percent * (1 - percent) / np.asarray(n_eff, dtype="float64"))
+
+
+def margin_of_error(percent, n_eff, z=Z_95):
+    """Half-width of the confidence interval of a share ``percent`` (0-1) over ``n_eff`` respondents."""
+    return z * standard_error(percent, n_eff)
+
+
+def confidence_interval(percent, moe):
+    """``(low, high)`` bounds of ``percent +/- moe``, clipped to 0-1."""
+    percent = np.asarray(percent, dtype="float64")
+    return np.clip(percent - moe, 0, 1), np.clip(percent + moe, 0, 1)
+
+
+def suppressed(group_n, n_eff, rule=None):
+    """Whether each group falls below ``rule`` (default :data:`SUPPRESSION`)."""
+    rule = rule or SUPPRESSION
+    with np.errstate(invalid="ignore"):
+        return (np.asarray(group_n) < rule.min_n) | ~(np.asarray(n_eff, dtype="float64") >= rule.min_n_eff)
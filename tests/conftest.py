@@ -0,0 +1,66 @@
+"""Synthetic records files shaped like the MAS records, for tests that need a small build."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from mas_data.loader import compact_table
+from mas_data.schema import DASHBOARD_COLUMNS, DEMOGRAPHIC_COLUMNS, RECORDS_PATH
+
+COUNTIES = ["Fulton", "DeKalb", "Cobb", "Gwinnett"]
+
+
+def make_records(years, respondents=120, questions=("q1", "q2"), responses=("Yes", "No", "DK"), seed=0):
+    """Records of ``respondents`` people per year, each answering every question.
+
+    Responses cycle through ``responses`` so every label is used.
+    Demographics and weights are random but fixed by ``seed``, and each
+    respondent's weights and demographics are the same on all of their records.
+    """
+    rng = np.random.default_rng(seed)
+    people = []
+    for year in years:
+        person = pd.DataFrame({"survey year": year, "survID": np.arange(1, respondents + 1)})
+        for column in DEMOGRAPHIC_COLUMNS:
+            labels = COUNTIES if column == "county" else [f"{column} {i}" for i in range(3)] + ["DK"]
+            person[column] = rng.choice(labels, respondents)
+        person["atlanta resident"] = np.where(person["county"] == "Fulton", rng.choice(["Yes", "No"], respondents), "No")
+        person["countywt"] = rng.uniform(0.3, 3, respondents)
+        person["atlwt"] = np.where(person["atlanta resident"] == "Yes", rng.uniform(0.3, 3, respondents), np.nan)
+        people.append(person)
+    people = pd.concat(people, ignore_index=True)
+
+    records = []
+    for number, question in enumerate(questions):
+        answers = people.copy()
+        answers["question"] = question
+        answers["q_short"] = f"TOPIC| {question} text"
+        answers["q_verb"] = f"How would you answer {question}?"
+        answers["response"] = [responses[(i + number) % len(responses)] for i in range(len(answers))]
+        records.append(answers)
+    return pd.concat(records, ignore_index=True)[DASHBOARD_COLUMNS]
+
+
+def make_frame(years, **kwargs):
+    """:func:`make_records` in the compact types the package loads records with."""
+    return compact_table(pa.Table.from_pandas(make_records(years, **kwargs), preserve_index=False)).to_pandas()
+
+
+@pytest.fixture
+def records_file(tmp_path):
+    """Write records made by :func:`make_records` to a parquet file and return its path."""
+    def write(name="records.parquet", **kwargs):
+        path = str(tmp_path / name)
+        make_records(**kwargs).to_parquet(path, index=False)
+        return path
+    return write
+
+
+@pytest.fixture(scope="session")
+def shipped_records():
+    """Path of the records file shipped with the dashboard, skipping when it is absent."""
+    import os
+    if not os.path.exists(RECORDS_PATH):
+        pytest.skip(f"{RECORDS_PATH} is not available")
+    return RECORDS_PATH
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mas_data.backends import BACKENDS, BackendUnavailable, get_backend
+
+KEYS = ["question", "year", "group", "response"]
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    try:
+        return get_backend(request.param)
+    except BackendUnavailable as error:
+        pytest.skip(str(error))
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rng = np.random.default_rng(0)
+    size = 5000
+    keys = {
+        "question": rng.integers(0, 4, size).astype(np.int16),
+        "year": rng.integers(0, 3, size).astype(np.int16),
+        # Unused group codes leave gaps, as groups absent from a year do
+        "group": rng.choice([0, 1, 2, 5, 9], size).astype(np.int32),
+        "response": rng.integers(0, 6, size).astype(np.int16),
+    }
+    return keys, rng.uniform(0.2, 4, size)
+
+
+def sorted_sums(sums):
+    return sums.sort_values(KEYS).reset_index(drop=True)
+
+
+def test_crosstab_matches_pandas(backend, rows):
+    keys, weights = rows
+    frame = pd.DataFrame({**keys, "weight": weights, "weight_sq": weights * weights})
+    expected = frame.groupby(KEYS).agg(n=("weight", "size"), weight=("weight", "sum"), weight_sq=("weight_sq", "sum")).reset_index()
+    sums = sorted_sums(backend.crosstab(keys, weights))
+    pd.testing.assert_frame_equal(sums[KEYS], expected[KEYS], check_dtype=False)
+    np.testing.assert_array_equal(sums["n"], expected["n"])
+    np.testing.assert_allclose(sums["weight"], expected["weight"], rtol=1e-9)
+    np.testing.assert_allclose(sums["weight_sq"], expected["weight_sq"], rtol=1e-9)
+
+
+def test_normalize_matches_pandas(backend, rows):
+    keys, weights = rows
+    sums = sorted_sums(backend.crosstab(keys, weights))
+    within = ["question", "year", "group"]
+    expected = sums["weight"] / sums.groupby(within)["weight"].transform("sum")
+    np.testing.assert_allclose(backend.normalize(sums, within), expected, rtol=1e-9)
@@ -0,0 +1,69 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from mas_data.build import AppendError, append_year, build, check_build, read_artifact
+from mas_data.snapshot import DataSnapshot
+from mas_data.star import CODE_TYPE
+
+from conftest import make_records
+
+
+def test_append_past_int8_codes(records_file, tmp_path):
+    # 120 response labels fit int8 codes; the appended year takes the dimension to 200
+    source = records_file("old.parquet", years=[2023], responses=[f"old {i}" for i in range(120)])
+    extra = records_file("new.parquet", years=[2024], responses=[f"new {i}" for i in range(80)], seed=1)
+    root = str(tmp_path / "build")
+    build(source, root)
+    append_year(extra, root, source, allow_new_labels=True)
+
+    assert check_build(root, source) is None
+    facts = read_artifact("facts", root)
+    assert facts["response_id"].dtype == CODE_TYPE
+    assert facts["response_id"].max() >= 128
+
+    frame = DataSnapshot(source, root).dataset.frame
+    expected = pd.concat([pd.read_parquet(source), pd.read_parquet(extra)])
+    assert len(frame) == len(expected)
+    assert sorted(frame["response"].astype(str).unique()) == sorted(expected["response"].unique())
+
+
+def test_fact_codes_share_one_schema(records_file, tmp_path):
+    source = records_file("old.parquet", years=[2023])
+    root = str(tmp_path / "build")
+    build(source, root)
+    schema = pa.dataset.dataset(f"{root}/facts", partitioning="hive").schema
+    assert schema.field("response_id").type == pa.int16()
+    assert schema.field("question_id").type == pa.int16()
+
+
+def _write_with_text_type(records, path, text_type):
+    table = pa.Table.from_pandas(records, preserve_index=False)
+    schema = pa.schema([
+        field.with_type(text_type) if pa.types.is_string(field.type) or pa.types.is_large_string(field.type) else field
+        for field in table.schema
+    ])
+    pq.write_table(table.cast(schema), path)
+    return path
+
+
+def test_append_accepts_large_string_columns(tmp_path):
+    # The shipped records use string; DataFrame.to_parquet under pandas 3 writes large_string
+    source = _write_with_text_type(make_records([2023]), str(tmp_path / "old.parquet"), pa.string())
+    extra = _write_with_text_type(make_records([2024], seed=1), str(tmp_path / "new.parquet"), pa.large_string())
+    root = str(tmp_path / "build")
+    build(source, root)
+    append_year(extra, root, source)
+    assert sorted(read_artifact("facts", root)["survey year"].unique()) == [2023, 2024]
+
+
+def test_append_refuses_other_column_types(tmp_path):
+    source = _write_with_text_type(make_records([2023]), str(tmp_path / "old.parquet"), pa.string())
+    records = make_records([2024], seed=1)
+    records["countywt"] = records["countywt"].astype(str)
+    extra = _write_with_text_type(records, str(tmp_path / "new.parquet"), pa.string())
+    root = str(tmp_path / "build")
+    build(source, root)
+    with pytest.raises(AppendError, match="countywt: expected floating point, got text"):
+        append_year(extra, root, source)
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mas_data.backends import NumpyBackend
+from mas_data.cube import CUBE_KEYS, TESTED_COLUMNS, AggregateCube, build_cube
+from mas_data.loader import load_records
+from mas_data.schema import (
+    ATLANTA_DEMOGRAPHIC,
+    ATLANTA_GROUP,
+    DASHBOARD_COLUMNS,
+    DEMO_COL_MAP,
+    TOTAL_DEMOGRAPHIC,
+    TOTAL_GROUP,
+    YEAR_COLUMN,
+)
+from mas_data.significance import chi_square_test, pairwise_tests
+from mas_data.stats import margin_of_error, suppressed
+
+from conftest import make_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_frame([2023, 2024], respondents=400, responses=("Yes", "No", "Maybe", "DK"))
+
+
+@pytest.fixture(scope="module")
+def cube(frame):
+    return AggregateCube(build_cube(frame))
+
+def groupby_cube(frame):
+    """The cube's weight, n and percent computed with a pandas groupby per slice."""
+    def piece(rows, demographic, group, weight):
+        return pd.DataFrame({
+            "question": rows["question"].astype(str),
+            YEAR_COLUMN: rows[YEAR_COLUMN],
+            "demographic": demographic,
+            "group": group,
+            "response": rows["response"].astype(str),
+            "w": rows[weight].astype("float64"),
+        })
+
+    pieces = [piece(frame, TOTAL_DEMOGRAPHIC, TOTAL_GROUP, "countywt")]
+    for demographic, column in DEMO_COL_MAP.items():
+        rows = frame[frame[column].notna()]
+        pieces.append(piece(rows, demographic, rows[column].astype(str), "countywt"))
+    residents = frame[frame["atlanta resident"] == "Yes"]
+    pieces.append(piece(residents, ATLANTA_DEMOGRAPHIC, ATLANTA_GROUP, "atlwt"))
+    cube = pd.concat(pieces).groupby(CUBE_KEYS).agg(weight=("w", "sum"), n=("w", "size")).reset_index()
+    cube["percent"] = cube["weight"] / cube.groupby(CUBE_KEYS[:-1])["weight"].transform("sum")
+    return cube
+
+
+def assert_matches_groupby(frame):
+    cube = build_cube(frame, NumpyBackend())
+    expected = groupby_cube(frame)
+    assert len(cube) == len(expected)
+    merged = cube.merge(expected, on=CUBE_KEYS, how="outer", suffixes=("", "_expected"), indicator=True)
+    assert (merged["_merge"] == "both").all()
+    np.testing.assert_array_equal(merged["n"], merged["n_expected"])
+    np.testing.assert_allclose(merged["weight"], merged["weight_expected"], rtol=1e-9)
+    np.testing.assert_allclose(merged["percent"], merged["percent_expected"], rtol=1e-9)
+
+
+def test_cube_matches_groupby():
+    frame = make_frame([2022, 2023, 2024], respondents=300)
+    # Unanswered demographics are left out of their slice
+    frame.loc[frame.index % 7 == 0, "income"] = np.nan
+    assert_matches_groupby(frame)
+
+
+def test_cube_matches_groupby_on_shipped_records(shipped_records):
+    assert_matches_groupby(load_records(DASHBOARD_COLUMNS, shipped_records))
+
+
+def test_chi_square_by_hand_without_excluded(cube, frame):
+    hidden = ["black or white 2"]
+    rows = frame[
+        (frame["question"] == "q1") & (frame[YEAR_COLUMN] == 2024)
+        & frame["black or white"].notna() & ~frame["black or white"].isin(hidden) & (frame["response"] != "DK")
+    ]
+    weights = rows["countywt"].astype("float64")
+    weight = rows.assign(w=weights).pivot_table("w", "black or white", "response", aggfunc="sum", observed=True).to_numpy()
+    weight_sq = (weights ** 2).sum()
+    share = weight / weight.sum()
+    expected = np.outer(share.sum(axis=1), share.sum(axis=0))
+    table_n_eff = weight.sum() ** 2 / weight_sq
+
+    test = cube.chi_square("q1", 2024, "Race", hidden, ["DK"])
+    assert test.df == (weight.shape[0] - 1) * (weight.shape[1] - 1)
+    assert test.statistic == pytest.approx(table_n_eff * ((share - expected) ** 2 / expected).sum(), rel=1e-9)
+    assert test.design_effect == pytest.approx(len(rows) / table_n_eff, rel=1e-9)
+
+
+def test_tests_leave_out_excluded_groups_and_responses(cube):
+    hidden = ["black or white 2"]
+    cells = cube.frame[(cube.frame["question"] == "q1") & (cube.frame[YEAR_COLUMN] == 2024) & (cube.frame["demographic"] == "Race")]
+    shown = cells[~cells["group"].isin(hidden) & (cells["response"] != "DK")][TESTED_COLUMNS]
+
+    assert cube.chi_square("q1", 2024, "Race", hidden, ["DK"]) == chi_square_test(shown, "Race")
+    pairs = cube.pairwise("q1", 2024, "Race", hidden, ["DK"])
+    pd.testing.assert_frame_equal(pairs, pairwise_tests(shown, "Race"))
+    assert not pairs["group"].isin(hidden).any() and not (pairs["response"] == "DK").any()
+    assert len(cube.pairwise("q1", 2024, "Race")) > len(pairs)
+
+
+def pooled_by_hand(frame, question, years, column, weight_column="countywt", members=None):
+    """Pooled cells from the records: each year's weights rescaled to its respondent count."""
+    rows = frame[(frame["question"] == question) & frame[YEAR_COLUMN].isin(years)]
+    base = rows if members is None else rows[members(rows)]
+    weights = base[weight_column].astype("float64")
+    scale = base[YEAR_COLUMN].map(base.groupby(YEAR_COLUMN).size() / weights.groupby(base[YEAR_COLUMN]).sum())
+    cells = base.assign(
+        group=base[column].astype(str) if members is None else ATLANTA_GROUP,
+        response=base["response"].astype(str),
+        w=weights * scale,
+        w_sq=(weights * scale) ** 2,
+    ).groupby(["group", "response"]).agg(weight=("w", "sum"), weight_sq=("w_sq", "sum"), n=("w", "size")).reset_index()
+    group = cells.groupby("group")[["weight", "weight_sq", "n"]].transform("sum")
+    cells["percent"] = cells["weight"] / group["weight"]
+    cells["n_eff"] = group["weight"] ** 2 / group["weight_sq"]
+    cells["group_n"] = group["n"]
+    return cells
+
+
+def test_pooled_matches_records():
+    years = [2021, 2022, 2023]
+    frame = make_frame(years, respondents=60, responses=("Yes", "No", "DK"))
+    # Years with very different weight totals, so pooling without rescaling would differ
+    frame["countywt"] = frame["countywt"] * np.where(frame[YEAR_COLUMN] == 2022, 5, 1).astype("float32")
+    frame["atlwt"] = frame["atlwt"] * np.where(frame[YEAR_COLUMN] == 2023, 3, 1).astype("float32")
+    cube = AggregateCube(build_cube(frame))
+
+    county = pooled_by_hand(frame, "q1", years, "county")
+    atlanta = pooled_by_hand(frame, "q1", years, "county", "atlwt", lambda rows: rows["atlanta resident"] == "Yes")
+    for demographic, expected in [("Race", pooled_by_hand(frame, "q1", years, "black or white")),
+                                  (ATLANTA_DEMOGRAPHIC, pd.concat([county, atlanta], ignore_index=True))]:
+        pooled = cube.pooled("q1", years, demographic).merge(expected, on=["group", "response"], suffixes=("", "_expected"))
+        assert len(pooled) == len(expected)
+        for column in ["weight", "percent", "n_eff"]:
+            np.testing.assert_allclose(pooled[column], pooled[f"{column}_expected"], rtol=1e-6)
+        np.testing.assert_array_equal(pooled["n"], pooled["n_expected"])
+        np.testing.assert_array_equal(pooled["group_n"], pooled["group_n_expected"])
+        np.testing.assert_allclose(pooled["moe"], margin_of_error(pooled["percent_expected"], pooled["n_eff_expected"]), rtol=1e-6)
+        np.testing.assert_array_equal(pooled["suppressed"], suppressed(pooled["group_n_expected"], pooled["n_eff_expected"]))
+
+    # About 15 respondents per group a year: too few alone, enough pooled
+    single = cube.crosstab("q1", 2023, "Race")
+    assert single["suppressed"].all() and not cube.pooled("q1", years, "Race")["suppressed"].any()
@@ -0,0 +1,30 @@
+import pyarrow.parquet as pq
+
+from conftest import make_records
+from mas_data.ingest import ingest, question_text
+from mas_data.schema import QUESTION_COLUMNS, RESPONDENT_KEY
+
+
+def test_ingest_round_trip(tmp_path, records_file):
+    source = records_file(years=[2023, 2024], respondents=80, questions=("q1", "q2", "q3"))
+    records = make_records([2023, 2024], respondents=80, questions=("q1", "q2", "q3"))
+    # Leave some answers blank: they must produce no record
+    records = records[~((records["question"] == "q2") & (records["survID"] % 7 == 0))]
+
+    respondent_columns = [column for column in records.columns if column not in QUESTION_COLUMNS]
+    wide = records.pivot(index=respondent_columns, columns="question", values="response").reset_index()
+    export = str(tmp_path / "export.csv")
+    wide.to_csv(export, index=False)
+
+    output = str(tmp_path / "ingested.parquet")
+    # A few kilobytes per block, so the export is read in several
+    rows = ingest([export], output, question_text(source), block_mb=0.004, records_schema=pq.read_schema(source))
+
+    assert rows == len(records)
+    assert pq.ParquetFile(output).metadata.num_row_groups > 1
+    ingested = pq.read_table(output).to_pandas()
+    assert list(ingested.columns) == list(records.columns)
+    key = RESPONDENT_KEY + ["question"]
+    ingested = ingested.sort_values(key).reset_index(drop=True)
+    expected = records.sort_values(key).reset_index(drop=True).astype(ingested.dtypes.to_dict())
+    assert ingested.equals(expected)
@@ -0,0 +1,36 @@
+from mas_data.memo import LRUMemo
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    memo = LRUMemo(max_entries=2, clock=FakeClock())
+    memo.get("a", lambda: 1)
+    memo.get("b", lambda: 2)
+    assert memo.get("a", lambda: -1) == 1
+    memo.get("c", lambda: 3)
+    assert len(memo) == 2
+    assert memo.get("b", lambda: 20) == 20
+    assert memo.get("c", lambda: -1) == 3
+    assert memo.stats() == {"entries": 2, "hits": 2, "misses": 4, "evictions": 2, "expirations": 0}
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    memo = LRUMemo(ttl=10, clock=clock)
+    memo.get("a", lambda: 1)
+    clock.now = 9.9
+    assert memo.get("a", lambda: -1) == 1
+    clock.now = 10
+    assert memo.get("a", lambda: 2) == 2
+    clock.now = 19.9
+    assert memo.get("a", lambda: -1) == 2
+    assert memo.stats() == {"entries": 1, "hits": 2, "misses": 2, "evictions": 0, "expirations": 1}
+    memo.clear()
+    assert memo.get("a", lambda: 3) == 3
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from mas_data.movers import MOVERS_COLUMNS, rank_movers
+from mas_data.schema import YEAR_COLUMN
+
+
+def test_rank_movers():
+    # "Black" skips 2022 and is first offered "Maybe" in 2023; "White" is
+    # suppressed in 2021 only
+    cube = pd.DataFrame(
+        [
+            ("Black", 2021, "Yes", 0.40, 20, False),
+            ("Black", 2021, "No", 0.60, 30, False),
+            ("Black", 2023, "Yes", 0.50, 30, False),
+            ("Black", 2023, "No", 0.30, 20, False),
+            ("Black", 2023, "Maybe", 0.20, 10, False),
+            ("White", 2021, "Yes", 0.90, 9, True),
+            ("White", 2021, "No", 0.10, 1, True),
+            ("White", 2022, "Yes", 0.85, 34, False),
+            ("White", 2022, "No", 0.15, 6, False),
+            ("White", 2023, "Yes", 0.80, 36, False),
+            ("White", 2023, "No", 0.20, 9, False),
+        ],
+        columns=["group", YEAR_COLUMN, "response", "percent", "n", "suppressed"],
+    ).assign(question="q1", demographic="Race")
+
+    movers = rank_movers(cube)
+
+    assert list(movers.columns) == MOVERS_COLUMNS
+    changes = movers.set_index(["group", "previous year", YEAR_COLUMN, "response"])
+    assert sorted(changes.index) == [
+        ("Black", 2021, 2023, "No"),
+        ("Black", 2021, 2023, "Yes"),
+        ("White", 2021, 2022, "No"),
+        ("White", 2021, 2022, "Yes"),
+        ("White", 2022, 2023, "No"),
+        ("White", 2022, 2023, "Yes"),
+    ]
+    assert changes.loc[("Black", 2021, 2023, "No"), "change"] == pytest.approx(-0.30)
+    assert changes.loc[("Black", 2021, 2023, "Yes"), ["previous group n", "group n"]].tolist() == [50, 60]
+    assert changes.xs(2022, level="previous year")["suppressed"].tolist() == [False, False]
+    assert changes.xs(2021, level="previous year").xs("White")["suppressed"].all()
+    assert not changes.xs("Black")["suppressed"].any()
+    assert movers["change"].abs().is_monotonic_decreasing
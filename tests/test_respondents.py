@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from mas_data.respondents import RespondentMatrix
+from mas_data.schema import RESPONDENT_COLUMN, YEAR_COLUMN
+
+from conftest import make_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_frame([2023, 2024], respondents=300, questions=("q1", "q2"), responses=("Yes", "No", "DK"))
+
+
+@pytest.mark.parametrize("demographic, group, column, value, weight", [
+    ("Race", "black or white 1", "black or white", "black or white 1", "countywt"),
+    ("Jurisdiction", "Cobb", "county", "Cobb", "countywt"),
+    ("Jurisdiction", "Atlanta", "atlanta resident", "Yes", "atlwt"),
+])
+def test_group_crosstab_matches_pandas(frame, demographic, group, column, value, weight):
+    matrix = RespondentMatrix(frame)
+    crosstab = matrix.crosstab("q1", "q2", 2024, demographic, group)
+
+    rows = frame[(frame[YEAR_COLUMN] == 2024) & (frame[column] == value)]
+    answers = rows.pivot(index=RESPONDENT_COLUMN, columns="question", values="response")
+    answers[weight] = rows.groupby(RESPONDENT_COLUMN)[weight].first()
+    expected = answers.astype({"q1": str, "q2": str}).groupby(["q1", "q2"])[weight].agg(["sum", "size"])
+
+    result = crosstab.set_index(["response_a", "response_b"]).sort_index()
+    assert result.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(result["weight"], expected["sum"], rtol=1e-6)
+    np.testing.assert_array_equal(result["n"], expected["size"])
@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from mas_data.schema import YEAR_COLUMN
+from mas_data.significance import ALPHA, change_notes, year_over_year_tests
+
+
+def test_change_notes():
+    trend = pd.DataFrame({"change": [np.nan, 0.042, -0.1], "significant": [False, True, False]})
+    assert change_notes(trend).tolist() == ["", "+4.2 pts (significant)", "-10.0 pts"]
+
+
+def two_sided_p(percent, n_eff, previous_percent, previous_n_eff):
+    z = (percent - previous_percent) / math.hypot(
+        math.sqrt(percent * (1 - percent) / n_eff), math.sqrt(previous_percent * (1 - previous_percent) / previous_n_eff)
+    )
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def test_year_over_year_tests_by_hand():
+    # "A" is suppressed in 2022 and "B" was not surveyed then, so both compare
+    # 2023 with 2021; suppressed years and "Maybe", only offered in 2023, go untested
+    trend = pd.DataFrame(
+        [
+            ("A", 2021, "Yes", 0.5, 100.0, False),
+            ("A", 2021, "No", 0.5, 100.0, False),
+            ("A", 2022, "Yes", 0.9, 10.0, True),
+            ("A", 2022, "No", 0.1, 10.0, True),
+            ("A", 2023, "Yes", 0.6, 200.0, False),
+            ("A", 2023, "No", 0.3, 200.0, False),
+            ("A", 2023, "Maybe", 0.1, 200.0, False),
+            ("B", 2021, "Yes", 0.3, 400.0, False),
+            ("B", 2023, "Yes", 0.5, 400.0, False),
+        ],
+        columns=["group", YEAR_COLUMN, "response", "percent", "n_eff", "suppressed"],
+    )
+    tested = year_over_year_tests(trend)
+
+    assert tested[list(trend.columns)].equals(trend)
+    np.testing.assert_array_equal(tested["previous year"], [np.nan, np.nan, np.nan, np.nan, 2021, 2021, np.nan, np.nan, 2021])
+    expected = {4: two_sided_p(0.6, 200, 0.5, 100), 5: two_sided_p(0.3, 200, 0.5, 100), 8: two_sided_p(0.5, 400, 0.3, 400)}
+    for row, (z, p) in expected.items():
+        assert math.isclose(tested.loc[row, "z"], z, rel_tol=1e-9)
+        assert math.isclose(tested.loc[row, "p_value"], p, rel_tol=1e-9)
+        assert tested.loc[row, "significant"] == (p < ALPHA)
+    assert tested.loc[[4, 5, 8], "significant"].tolist() == [False, True, True]
+    np.testing.assert_allclose(tested.loc[[4, 5, 8], "change"], [0.1, -0.2, 0.2])
+    untested = tested.drop(index=list(expected))
+    assert untested["p_value"].isna().all() and not untested["significant"].any()
+
+
+def test_year_over_year_tests_single_group():
+    trend = pd.DataFrame(
+        {YEAR_COLUMN: [2021, 2024], "response": ["Yes", "Yes"], "percent": [0.3, 0.5], "n_eff": [400.0, 400.0], "suppressed": [False, False]}
+    )
+    tested = year_over_year_tests(trend)
+    assert "group" not in tested.columns
+    assert tested["previous year"].tolist()[1] == 2021
+    assert math.isclose(tested["z"].iloc[1], two_sided_p(0.5, 400, 0.3, 400)[0], rel_tol=1e-9)